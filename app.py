@@ -1,14 +1,21 @@
+import os
+import threading
+import time
+
 import streamlit as st
-import cv2
-import numpy as np
-import hashlib
-from ultralytics import YOLO
 
 from ui.styles import load_styles
 from ui.sidebar import render_sidebar
 from ui.header import render_header
 from ui.dashboard import render_dashboard
-from backend.database import upsert_animal
+from ui.performance import render_performance
+from backend.database import record_sightings, get_all_animals, herd_version, set_behaviors
+from vision.config import DetectionConfig, FARM_CLASSES, INPUT_SIZES
+from vision.jobs import JobQueue
+from backend import metrics
+
+# cv2 / the detector / re-id are imported by the pages that use them, so
+# Dashboard, Vet and Settings paint without loading the vision stack
 
 st.set_page_config("Smart Farm OS", layout="wide")
 
@@ -18,18 +25,71 @@ render_sidebar()
 language = st.selectbox("🌐 Language", ["English", "Hindi"])
 render_header(language)
 
-@st.cache_resource
+# Comma-separated cameras: device index ("0"), stream URL, or a video file
+# played as a fake camera
+CAMERA_SOURCES = [
+    s.strip() for s in os.environ.get("FARM_CAMERA_SOURCES", "0").split(",") if s.strip()
+]
+CAMERA_FPS = 5.0   # per-camera sampling rate before load shedding
+
+# Live-camera motion gate (see vision.motion.MotionGate); None = always detect
+MOTION_GATE = {}
+
+# "1" = start loading the model in the background when the server starts
+PREWARM = os.environ.get("FARM_PREWARM", "0") == "1"
+
 def load_model():
-    return YOLO("./yolov8n.pt")
+    # torch / onnx / onnx-int8, from FARM_INFERENCE_BACKEND (see vision.inference);
+    # loaded once per server, on first use or by the prewarm thread
+    from vision.inference import shared_detector
+    return shared_detector()
 
-model = load_model()
+@st.cache_resource
+def start_prewarm():
+    thread = threading.Thread(target=load_model, name="model-prewarm", daemon=True)
+    thread.start()
+    return thread
 
-def gen_id(crop, animal):
-    _, buf = cv2.imencode(".jpg", crop)
-    return f"{animal.upper()}_{hashlib.md5(buf).hexdigest()[:8]}"
+if PREWARM:
+    start_prewarm()
+
+# Set to e.g. /var/lib/node_exporter/farm.prom to export metrics every 15 s
+METRICS_FILE = os.environ.get("FARM_METRICS_FILE")
+
+@st.cache_resource
+def start_metrics_export():
+    exporter = metrics.Exporter(METRICS_FILE)
+    exporter.start()
+    return exporter
 
-def health(conf):
-    return "Healthy" if conf >= 0.6 else "Needs Vet Support"
+if METRICS_FILE:
+    start_metrics_export()
+
+# Classes / thresholds / input sizes, edited on the Settings page
+detection_config = DetectionConfig.load()
+
+@st.cache_resource
+def load_reid_index():
+    # Shared by all sessions; seeded with the hashes of known animals
+    from vision.reid import ReIdIndex
+    return ReIdIndex.from_herd(get_all_animals())
+
+def load_reid():
+    # Catch up with animals video jobs added since the last call
+    index = load_reid_index()
+    index.sync(herd_version(), get_all_animals)
+    return index
+
+@st.cache_resource
+def load_jobs():
+    # One worker pool per server; unfinished jobs resume from their checkpoint
+    return JobQueue()
+
+jobs = load_jobs()
+
+def gen_id(crop, animal):
+    """(animal_id, phash) — same animal across frames → same id."""
+    return load_reid().identify(crop, animal.capitalize())
 
 page = st.session_state.page
 
@@ -39,25 +99,27 @@ if page == "Detection":
     uploaded = st.file_uploader("Upload image", type=["jpg","png","jpeg"])
 
     if uploaded:
-        img = cv2.imdecode(np.frombuffer(uploaded.read(), np.uint8), 1)
-        results = model(img)
+        import cv2
+        import numpy as np
+        from vision.detection import INFERENCE_MS, parse_results, crop_of, make_sighting
+
+        model = load_model()
+        # Decode straight from the upload's buffer — no extra bytes copy
+        img = cv2.imdecode(np.frombuffer(uploaded.getbuffer(), np.uint8), 1)
+        detections = []
 
-        for box in results[0].boxes:
-            cls = int(box.cls[0])
-            conf = float(box.conf[0])
-            animal = results[0].names[cls]
+        with INFERENCE_MS.time():
+            result = model(img, **detection_config.options(model.names, "image"))[0]
 
-            x1,y1,x2,y2 = map(int, box.xyxy[0])
-            crop = img[y1:y2, x1:x2]
+        for det in parse_results(result):
+            crop = crop_of(img, det.xyxy)
             if crop.size == 0:
                 continue
 
-            upsert_animal(
-                gen_id(crop, animal),
-                animal.capitalize(),
-                health(conf)
-            )
+            animal_id, crop_hash = gen_id(crop, det.animal)
+            detections.append(make_sighting(animal_id, crop_hash, det, "image"))
 
+        record_sightings(detections)
         st.success("Detection complete.")
         st.rerun()
 
@@ -66,43 +128,30 @@ elif page == "Video":
     st.subheader("🎥 Video Detection")
     video = st.file_uploader("Upload video", type=["mp4","avi"])
 
-    if video:
-        temp = "temp.mp4"
-        with open(temp, "wb") as f:
-            f.write(video.read())
-
-        cap = cv2.VideoCapture(temp)
-        frame_count = 0
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
+    # Processing runs in background worker processes; this page only polls
+    if video and st.button("▶ Process video"):
+        jobs.submit_video(video, video.name)
+        st.toast(f"Queued {video.name}")
 
-            frame_count += 1
-            if frame_count % 15 != 0:
+    @st.fragment(run_every=1.0)
+    def render_jobs():
+        for job in jobs.jobs(limit=10):
+            if job["kind"] != "video":
                 continue
-
-            results = model(frame)
-            for box in results[0].boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                animal = results[0].names[cls]
-
-                x1,y1,x2,y2 = map(int, box.xyxy[0])
-                crop = frame[y1:y2, x1:x2]
-                if crop.size == 0:
-                    continue
-
-                upsert_animal(
-                    gen_id(crop, animal),
-                    animal.capitalize(),
-                    health(conf)
-                )
-
-        cap.release()
-        st.success("Video processed.")
-        st.rerun()
+            label = f"{job['name']} · {job['status']}"
+            if job["status"] in ("queued", "running"):
+                st.progress(job["progress"], label)
+            elif job["status"] == "done":
+                st.caption(f"✅ {label} ({job['stats']['fps']:.0f} frames/s)")
+            elif job["status"] == "failed":
+                col_msg, col_retry, col_dismiss = st.columns([6, 1, 1])
+                col_msg.caption(f"⚠️ {label} at {job['progress']:.0%}: {job['error']}")
+                if col_retry.button("↻ Retry", key=f"retry-{job['id']}"):
+                    jobs.retry(job["id"])
+                if col_dismiss.button("✕", key=f"dismiss-{job['id']}", help="Discard the upload"):
+                    jobs.dismiss(job["id"])
+
+    render_jobs()
 
 # ---------- DASHBOARD ----------
 elif page == "Dashboard":
@@ -118,6 +167,37 @@ elif page == "Settings":
     st.session_state.profile["farm"] = st.text_input("Farm", st.session_state.profile["farm"])
     st.session_state.profile["location"] = st.text_input("Location", st.session_state.profile["location"])
 
+    st.markdown("#### 🎯 Detection")
+    with st.form("detection_config"):
+        classes = st.multiselect(
+            "Animals to detect", FARM_CLASSES, detection_config.classes,
+            help="Everything else (people, vehicles, furniture) is dropped inside the model."
+        )
+        conf = st.slider("Minimum confidence", 0.05, 0.95, float(detection_config.conf), 0.05)
+        iou = st.slider("Overlap allowed between boxes (NMS IoU)", 0.1, 0.9, float(detection_config.iou), 0.05)
+        max_det = st.number_input("Max animals per frame", 1, 300, int(detection_config.max_det))
+
+        st.caption("Input size: smaller is faster, larger finds smaller / farther animals.")
+        sizes = {}
+        size_cols = st.columns(3)
+        for col, source in zip(size_cols, ["image", "video", "camera"]):
+            sizes[source] = col.selectbox(
+                source.capitalize(), INPUT_SIZES,
+                INPUT_SIZES.index(detection_config.input_size(source))
+            )
+        for i in range(1, len(CAMERA_SOURCES) + 1):
+            camera_id = f"cam{i}"
+            current = detection_config.input_size(camera_id, "camera")
+            size = size_cols[(i - 1) % 3].selectbox(
+                f"{camera_id} ({CAMERA_SOURCES[i - 1]})", INPUT_SIZES, INPUT_SIZES.index(current)
+            )
+            if size != sizes["camera"]:
+                sizes[camera_id] = size
+
+        if st.form_submit_button("Save detection settings"):
+            DetectionConfig(classes, conf, iou, max_det, sizes).save()
+            st.success("Saved. Applies to the next image, video or camera start.")
+
 # ===================== EXTENSIONS (APPEND ONLY) =====================
 
 # ---- EMOJI MAP (GLOBAL) ----
@@ -131,18 +211,6 @@ ANIMAL_EMOJI_EXT = {
     "Dog": "🐕"
 }
 
-# ---- SIMPLE BEHAVIOR ANALYSIS (VIDEO FRAMES) ----
-def analyze_behavior(motion_score):
-    """
-    motion_score: average pixel movement
-    """
-    if motion_score < 5:
-        return "Low Activity (Possible Weakness)"
-    elif motion_score > 40:
-        return "High Restlessness (Possible Stress)"
-    else:
-        return "Normal Behavior"
-
 # ---- DISEASE HINT ENGINE (EXPLAINABLE) ----
 def infer_possible_disease(confidence, behavior):
     if confidence < 0.5 and "Low Activity" in behavior:
@@ -160,67 +228,45 @@ def vet_map_link(location="nearest veterinary hospital"):
 if page == "Vet":
     st.subheader("🩺 Vet Support / पशु चिकित्सक")
 
-    from backend.database import get_all_animals
-    df = get_all_animals()
+    from backend.database import get_alerts, get_animal
+
+    # Maintained on ingest: O(open alerts), not a scan of the herd
+    alerts = get_alerts()
+    open_alerts = alerts.open_alerts()
 
-    critical = df[df["health_status"] != "Healthy"]
+    # "New" = raised or escalated since this session last looked
+    last_visit = st.session_state.get("vet_last_visit", "")
+    fresh = {a["animal_id"] for a in alerts.alerts_since(last_visit)} if last_visit else set()
+    st.session_state.vet_last_visit = time.strftime("%Y-%m-%d %H:%M:%S")
 
-    if critical.empty:
+    if not open_alerts:
         st.success("✅ All animals are healthy. No vet visit required.")
     else:
-        st.warning("🚨 Some animals need vet support")
-
-        for _, row in critical.iterrows():
-            emoji = ANIMAL_EMOJI_EXT.get(row["animal_type"], "🐾")
-            st.markdown(f"### {emoji} {row['display_name']}")
-            st.write("Status:", row["health_status"])
+        st.warning(f"🚨 {len(open_alerts)} animals need vet support")
+        if fresh:
+            st.info(f"🔔 {len(fresh)} new or escalated since your last visit")
+
+        for alert in open_alerts:
+            animal = get_animal(alert["animal_id"]) or {}
+            emoji = ANIMAL_EMOJI_EXT.get(alert["animal_type"], "🐾")
+            name = animal.get("display_name") or alert["animal_type"]
+            new_badge = " 🔔" if alert["animal_id"] in fresh else ""
+            st.markdown(f"### {emoji} {name}{new_badge}")
+            st.write("Reason:", ", ".join(alert["reasons"]))
+            st.caption(
+                f"Raised {alert['raised']} · flagged in sightings from "
+                f"{alert.get('first_flagged', alert['raised'])} to {alert['last_flagged']} · "
+                f"level {alert['level']}"
+            )
+            if len(alert["escalations"]) > 1:
+                st.caption("Escalated: " + "; ".join(
+                    f"{e['at']} ({e['why']})" for e in alert["escalations"][1:]
+                ))
 
             st.markdown(
                 f"[📍 Find Nearest Vet]({vet_map_link(st.session_state.profile.get('location','vet'))})"
             )
 
-# ===================== VIDEO BEHAVIOR EXTENSION =====================
-if page == "Video":
-    st.subheader("🎥 Video Behavior Analysis")
-
-    video = st.file_uploader("Upload animal video", type=["mp4", "avi", "mov"])
-
-    if video:
-        temp_path = "temp_behavior.mp4"
-        with open(temp_path, "wb") as f:
-            f.write(video.read())
-
-        cap = cv2.VideoCapture(temp_path)
-        prev_gray = None
-        motion_values = []
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            if prev_gray is not None:
-                diff = cv2.absdiff(prev_gray, gray)
-                motion_values.append(np.mean(diff))
-            prev_gray = gray
-
-        cap.release()
-
-        if motion_values:
-            motion_score = sum(motion_values) / len(motion_values)
-            behavior = analyze_behavior(motion_score)
-
-            st.info(f"🧠 Behavior Analysis: {behavior}")
-
-            disease_hint = infer_possible_disease(0.45, behavior)
-            st.warning(f"🦠 AI Health Hint: {disease_hint}")
-
-            if "Possible" in disease_hint:
-                st.markdown(
-                    f"[📍 Find Nearest Vet]({vet_map_link(st.session_state.profile.get('location','vet'))})"
-                )
-
 # ===================== LANGUAGE HELPER (OPTIONAL USE) =====================
 def t(en, hi):
     return en if language == "English" else hi
@@ -239,45 +285,65 @@ if page == "Live Camera":
 
     run_cam = st.toggle("▶ Start Camera")
 
-    if run_cam:
-        cam = cv2.VideoCapture(0)
-        frame_slot = st.empty()
+    streams = st.session_state.get("live_streams")
+    if run_cam and streams is None:
+        from vision.streams import StreamManager
 
-        while run_cam and cam.isOpened():
-            ret, frame = cam.read()
-            if not ret:
-                st.error("Camera not accessible")
-                break
+        streams = StreamManager(
+            load_model(), load_reid(), record_sightings, fps=CAMERA_FPS,
+            gate_options=MOTION_GATE, config=detection_config, behaviors_sink=set_behaviors
+        )
+        for i, source in enumerate(CAMERA_SOURCES, start=1):
+            streams.add(f"cam{i}", source)
+        st.session_state.live_streams = streams.start()
+    elif not run_cam and streams is not None:
+        st.session_state.pop("live_streams").stop()
 
-            results = model(frame)
-            for box in results[0].boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                animal = results[0].names[cls]
-
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                cv2.rectangle(frame, (x1,y1), (x2,y2), (0,255,0), 2)
-                cv2.putText(
-                    frame,
-                    f"{animal} {conf:.2f}",
-                    (x1, y1-10),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.6,
-                    (0,255,0),
-                    2
-                )
-
-                crop = frame[y1:y2, x1:x2]
-                if crop.size != 0:
-                    upsert_animal(
-                        gen_id(crop, animal),
-                        animal.capitalize(),
-                        health(conf)
+    if run_cam:
+        camera_ids = list(streams.streams)
+        grid = st.columns(min(len(camera_ids), 2))
+        slots = {
+            cid: (grid[i % len(grid)].empty(), grid[i % len(grid)].empty())
+            for i, cid in enumerate(camera_ids)
+        }
+        status_slot = st.empty()
+
+        # The script thread only displays; capture/inference/storage run on their own threads
+        while streams.running:
+            stats = streams.stats()
+            for cid, (frame_slot, caption_slot) in slots.items():
+                cam = stats["cameras"][cid]
+                frame = streams.latest(cid)
+                if frame is not None:
+                    frame_slot.image(frame, channels="BGR")
+                if cam["error"]:
+                    caption_slot.error(f"{cid}: {cam['error']}")
+                else:
+                    caption_slot.caption(
+                        f"{cid} · AI {cam['inference_fps']:.1f}/{cam['target_fps']:.1f} fps · "
+                        f"latency {cam['latency_ms']:.0f} ms · dropped {cam['dropped']} · "
+                        f"still {cam['skip_fraction']:.0%}"
                     )
 
-            frame_slot.image(frame, channels="BGR")
+            status = (
+                f"{len(camera_ids)} camera(s) · load ×{stats['load_factor']:.2f} · "
+                f"saved {stats['persisted']}"
+            )
+            if stats["errors"]:
+                status_slot.warning(f"{status} · {stats['errors']} failed batch(es), last: {stats['last_error']}")
+            else:
+                status_slot.caption(status)
+            if all(cam["error"] for cam in stats["cameras"].values()):
+                break
+            time.sleep(1 / 15)
+
+        if not streams.running:
+            st.error(f"Camera processing stopped. Last error: {streams.last_error or 'unknown'}")
+        st.session_state.pop("live_streams").stop()
 
-        cam.release()
+# Leaving the camera page stops every camera
+if page != "Live Camera" and "live_streams" in st.session_state:
+    st.session_state.pop("live_streams").stop()
 
 
 # ---- SYSTEM TRANSPARENCY PANEL ----
@@ -294,11 +360,7 @@ if page == "Settings":
         """
     )
 
-    st.markdown("### ⚙ System Status")
-    st.success("✔ Camera: Ready")
-    st.success("✔ AI Model: Loaded")
-    st.success("✔ Local Storage: Active")
-    st.info("✔ Works in low or no internet environments")
+    render_performance()
 
 
 # ---- OFFLINE NOTICE (GLOBAL) ----
@@ -323,80 +385,39 @@ st.markdown(
 
 # ===================== END OF ALL EXTENSIONS =====================
 
-# ===================== BEHAVIOR ANALYSIS FIX =====================
-
-def analyze_behavior_from_video(video_path):
-    """
-    Robust motion-based behavior analysis.
-    Always returns a result + explanation.
-    """
-    cap = cv2.VideoCapture(video_path)
-    prev_gray = None
-    motion_sum = 0
-    frame_count = 0
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        frame_count += 1
-
-        # Sample every 10th frame to reduce noise
-        if frame_count % 10 != 0:
-            continue
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-        if prev_gray is not None:
-            diff = cv2.absdiff(prev_gray, gray)
-            motion = np.mean(diff)
-            motion_sum += motion
-
-        prev_gray = gray
-
-    cap.release()
-
-    if frame_count == 0:
-        return "Unknown", "Video could not be analyzed"
-
-    avg_motion = motion_sum / max(1, frame_count)
-
-    # ---- Farmer-friendly interpretation ----
-    if avg_motion < 3:
-        return (
-            "Low Activity",
-            "Animal is moving very little. This can indicate weakness, illness, or tiredness."
-        )
-    elif avg_motion > 25:
-        return (
-            "High Restlessness",
-            "Animal is moving too much. This can indicate stress, discomfort, or pain."
-        )
-    else:
-        return (
-            "Normal Behavior",
-            "Animal movement appears normal."
-        )
-
 # ===================== OVERRIDE VIDEO PAGE (BEHAVIOR OUTPUT) =====================
 if page == "Video":
     st.subheader("🎥 Video Behavior Analysis")
 
     video = st.file_uploader("Upload animal video", type=["mp4", "avi", "mov"])
 
-    if video:
-        temp_path = "behavior_temp.mp4"
-        with open(temp_path, "wb") as f:
-            f.write(video.read())
-
-        st.info("Analyzing animal behavior… Please wait.")
-
-        behavior, explanation = analyze_behavior_from_video(temp_path)
-
+    # Robust motion-based behavior analysis (3 samples/s) in a background job
+    if video and st.session_state.get("behavior_result_upload") != video.file_id:
+        st.session_state.behavior_result_upload = video.file_id
+        st.session_state.behavior_result_job = jobs.submit_behavior(video, video.name)["id"]
+
+    @st.fragment(run_every=1.0)
+    def render_behavior_result():
+        job = jobs.status(st.session_state.get("behavior_result_job", ""))
+        if job is None:
+            return
+        if job["status"] in ("queued", "running"):
+            st.info("Analyzing animal behavior… Please wait.")
+            return
+        if job["status"] == "failed":
+            st.error(f"Video could not be analyzed: {job['error']}")
+            return
+
+        stats = job["stats"]
+        behavior = stats["behavior"]
         st.markdown("### 🧠 AI Behavior Result")
         st.write(f"**Behavior:** {behavior}")
-        st.write(f"**Explanation:** {explanation}")
+        st.write(f"**Explanation:** {stats['explanation']}")
+        st.warning(f"🦠 AI Health Hint: {infer_possible_disease(0.45, behavior)}")
+
+        if stats["seconds"]:
+            st.caption("Movement per second of video")
+            st.line_chart({"second": stats["seconds"], "motion": stats["motion"]}, x="second", y="motion")
 
         # ---- Vet trigger ----
         if behavior in ["Low Activity", "High Restlessness"]:
@@ -407,4 +428,6 @@ if page == "Video":
         else:
             st.success("✅ No vet action required.")
 
+    render_behavior_result()
+
 # ===================== END BEHAVIOR FIX =====================
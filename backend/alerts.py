@@ -0,0 +1,229 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+from backend.locking import FileLock, atomic_write
+from backend.storage import file_token
+
+UNHEALTHY = "Needs Vet Support"
+# Behavior labels (vision.motion.classify_behavior) worth a vet's attention
+ALERT_BEHAVIORS = ("Low Activity", "High Restlessness")
+
+ESCALATE_AFTER = timedelta(hours=24)   # still flagged this long after raising → escalate
+RESOLVED_KEPT = 100                    # closed alerts kept for the history view
+REFRESH_SAVE_INTERVAL = 30.0           # s; unsaved last_flagged refreshes are written at least this often
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def alert_reasons(row):
+    """Why a herd row needs attention: subset of ["health", "behavior: <label>"]."""
+    reasons = []
+    if row.get("health_status") == UNHEALTHY:
+        reasons.append("health")
+    behavior = row.get("behavior")
+    if isinstance(behavior, str) and behavior.startswith(ALERT_BEHAVIORS):
+        reasons.append(f"behavior: {behavior}")
+    return reasons
+
+
+class AlertIndex:
+    """
+    Open health / behavior alerts, maintained on ingest.
+
+    observe() is handed the herd rows a write just changed — never the
+    whole herd — and moves each animal between "no alert" and "open
+    alert": the first flagged row raises an alert, further flagged
+    sightings only refresh it, a new reason or an alert left open for
+    ESCALATE_AFTER escalates it, and a row that is healthy again resolves
+    it. Reads are O(open alerts).
+
+    Raising, escalating and resolving are stamped with the wall-clock time
+    of the write (`now`); the sighting times that caused them are kept
+    apart ("first_flagged" / "last_flagged"). A video processed hours
+    after it was recorded, or a behavior label set on an old row, still
+    raises a fresh alert the vet sees as new.
+
+    Kept in one JSON file written atomically under a file lock, so the
+    app and the job workers share it; readers reload when the file changes.
+    Raising, escalating and resolving are written at once. A repeat
+    sighting of a flagged animal only moves its "last_flagged" in memory:
+    those refreshes are written by flush() (after each compaction) or with
+    the next write at least REFRESH_SAVE_INTERVAL s after the last one, so
+    the ingest path does not rewrite the whole file per sighting.
+    """
+
+    def __init__(self, path, check_interval=0.5):
+        self.path = path
+        self.lock = FileLock(path + ".lock")
+        self.check_interval = check_interval
+        self._mutex = threading.RLock()
+        self._state = None
+        self._token = None
+        self._checked_at = 0.0
+        self._unsaved = False      # last_flagged refreshes not written yet
+        self._stored_at = time.monotonic()
+
+    @property
+    def exists(self):
+        return file_token(self.path) is not None
+
+    # ---------- load / store ----------
+    def _load(self):
+        self._unsaved = False
+        self._token = file_token(self.path)
+        self._checked_at = time.monotonic()
+        if self._token is None:
+            self._state = {"open": {}, "resolved": []}
+            return
+        with open(self.path) as f:
+            self._state = json.load(f)
+
+    def _ensure(self):
+        now = time.monotonic()
+        if self._state is None:
+            self._load()
+        elif now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            if file_token(self.path) != self._token:
+                self._load()
+
+    def _store(self):
+        # dumps() uses the C encoder; dump() to a file encodes in Python chunks
+        text = json.dumps(self._state)
+        atomic_write(self.path, lambda f: f.write(text))
+        self._token = file_token(self.path)
+        self._unsaved = False
+        self._stored_at = time.monotonic()
+
+    # ---------- ingest ----------
+    def observe(self, rows, now=None):
+        """
+        Update alerts from changed herd rows (dicts with at least animal_id,
+        animal_type, health_status, behavior, last_seen). Returns the alerts
+        raised or escalated by this call.
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+        now = now or datetime.now().strftime(TIME_FORMAT)
+        changed = []
+        with self._mutex, self.lock:
+            if file_token(self.path) != self._token or self._state is None:
+                self._load()
+            dirty = False
+            for row in rows:
+                event, touched = self._observe_row(row, now)
+                dirty = dirty or touched
+                if event is not None:
+                    changed.append(event)
+            overdue = self._unsaved and time.monotonic() - self._stored_at >= REFRESH_SAVE_INTERVAL
+            if dirty or overdue:
+                self._store()
+        return changed
+
+    def flush(self):
+        """Write pending last_flagged refreshes, if any."""
+        with self._mutex:
+            if not self._unsaved:
+                return
+            with self.lock:
+                if file_token(self.path) == self._token:
+                    self._store()
+                else:
+                    self._load()   # another process wrote meanwhile; its state wins
+
+    def _observe_row(self, row, now):
+        """
+        (alert if raised/escalated else None, whether it must be written now).
+        A refresh of last_flagged alone is only marked unsaved.
+        """
+        open_alerts = self._state["open"]
+        animal_id = row["animal_id"]
+        reasons = alert_reasons(row)
+        alert = open_alerts.get(animal_id)
+        seen = row.get("last_seen")
+        seen = seen if isinstance(seen, str) and seen else now
+
+        if not reasons:
+            if alert is None:
+                return None, False
+            alert["resolved"] = now
+            resolved = self._state["resolved"]
+            resolved.append(open_alerts.pop(animal_id))
+            del resolved[:-RESOLVED_KEPT]
+            return None, True
+
+        if alert is None:
+            alert = {
+                "animal_id": animal_id,
+                "animal_type": row.get("animal_type"),
+                "raised": now,
+                "first_flagged": seen,
+                "last_flagged": seen,
+                "reasons": reasons,
+                "level": 1,
+                "escalations": [{"at": now, "level": 1, "why": "raised: " + ", ".join(reasons)}]
+            }
+            open_alerts[animal_id] = alert
+            return alert, True
+
+        # Already flagged: refresh, escalate only on something new
+        if alert["last_flagged"] != seen:
+            alert["last_flagged"] = seen
+            self._unsaved = True
+        why = [r for r in reasons if r not in alert["reasons"]]
+        dropped = set(alert["reasons"]) - set(reasons)
+        alert["reasons"] = reasons
+        overdue = (
+            not any(e["why"].startswith("open for") for e in alert["escalations"])
+            and _parse(now) - _parse(alert["raised"]) >= ESCALATE_AFTER
+        )
+        if overdue:
+            why.append(f"open for {ESCALATE_AFTER.total_seconds() / 3600:.0f}h")
+        if why:
+            alert["level"] += 1
+            alert["escalations"].append({"at": now, "level": alert["level"], "why": ", ".join(why)})
+            return alert, True
+        return None, bool(dropped)
+
+    def rebuild(self, rows, now=None):
+        """Start over from a full herd (first start on existing records)."""
+        now = now or datetime.now().strftime(TIME_FORMAT)
+        with self._mutex, self.lock:
+            self._state = {"open": {}, "resolved": []}
+            for row in rows:
+                self._observe_row(row, now)
+            self._store()
+
+    def discard(self, animal_ids):
+        """Drop the alerts of deleted animals."""
+        animal_ids = list(animal_ids)
+        with self._mutex, self.lock:
+            if file_token(self.path) != self._token or self._state is None:
+                self._load()
+            removed = [a for a in animal_ids if self._state["open"].pop(a, None) is not None]
+            if removed:
+                self._store()
+
+    # ---------- reads ----------
+    def open_alerts(self):
+        """Open alerts, most severe then most recent first."""
+        with self._mutex:
+            self._ensure()
+            alerts = list(self._state["open"].values())
+        return sorted(alerts, key=lambda a: (a["level"], a["escalations"][-1]["at"]), reverse=True)
+
+    def alerts_since(self, since):
+        """Open alerts raised or escalated after `since` ("%Y-%m-%d %H:%M:%S", wall clock)."""
+        return [a for a in self.open_alerts() if a["escalations"][-1]["at"] > since]
+
+    def resolved(self, limit=20):
+        with self._mutex:
+            self._ensure()
+            return list(reversed(self._state["resolved"][-limit:]))
+
+
+def _parse(ts):
+    return datetime.strptime(ts[:19], TIME_FORMAT)
@@ -0,0 +1,262 @@
+import os
+import shutil
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from backend.locking import FileLock
+from backend.storage import file_token
+
+# Column name → dtype of the compact on-disk representation
+ARCHIVE_COLUMNS = {
+    "ts": np.uint32,         # seconds since epoch (local wall clock)
+    "animal": np.int32,      # code into animals.txt
+    "type": np.uint8,        # code into types.txt
+    "conf": np.float16,
+    "health": np.uint8,      # index into HEALTH
+    "source": np.uint8       # index into SOURCES
+}
+
+HEALTH = ["Healthy", "Needs Vet Support"]
+SOURCES = ["", "image", "video", "camera"]
+
+MERGE_EVERY = 64   # parts this process writes to one day before it merges the day
+
+
+class _Dictionary:
+    """Append-only string ↔ int code table stored one value per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self.values = []
+        self.codes = {}
+        self._size = -1
+
+    def refresh(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size != self._size:
+            with open(self.path, "a+", encoding="utf-8") as f:
+                f.seek(0)
+                self.values = f.read().splitlines()
+            self.codes = {v: i for i, v in enumerate(self.values)}
+            self._size = size
+
+    def encode(self, values):
+        """Codes for values, appending unseen ones (caller holds the lock)."""
+        self.refresh()
+        new = [v for v in dict.fromkeys(values) if v not in self.codes]
+        if new:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(v + "\n" for v in new))
+            for v in new:
+                self.codes[v] = len(self.values)
+                self.values.append(v)
+            self._size = os.path.getsize(self.path)
+        return np.fromiter((self.codes[v] for v in values), dtype=np.int64, count=len(values))
+
+
+class SightingArchive:
+    """
+    Long-range sighting history as day partitions of typed NumPy columns:
+
+        archive/2026-10-18/part-<time_ns>-<pid>/{ts,animal,type,conf,health,source}.npy
+
+    Parts are immutable and written once (temp dir + rename); reads
+    memory-map them, so queries touch only the days and columns they need
+    instead of loading the whole history.
+
+    Every compaction adds a small part, so parts are merged: a day is
+    folded into one "base-<time_ns>" part once it has closed, and while it
+    is open after every MERGE_EVERY parts. A base lists the parts it
+    covers; readers skip those, so the covered parts can be deleted after
+    the new base is in place without a reader ever counting a row twice.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.lock = FileLock(os.path.join(root, ".lock"))
+        self._stamp = os.path.join(root, ".changed")   # mtime bumped on every new part
+        self.animals = _Dictionary(os.path.join(root, "animals.txt"))
+        self.types = _Dictionary(os.path.join(root, "types.txt"))
+        self._read_lock = threading.Lock()
+        self._written = {}          # day → parts written since this process last merged it
+        self._closed_through = None # days before this were checked for merging
+
+    # ---------- writing ----------
+    def append(self, events):
+        """Archive sighting events (dicts as written to the sighting log)."""
+        if not events:
+            return
+        df = pd.DataFrame(events)
+        with self.lock:
+            columns = {
+                "ts": pd.to_datetime(df["timestamp"]).to_numpy().astype("datetime64[s]").astype(np.int64),
+                "animal": self.animals.encode(df["animal_id"].tolist()),
+                "type": self.types.encode(df["animal_type"].tolist()),
+                "conf": pd.to_numeric(df["confidence"], errors="coerce").fillna(0).to_numpy(),
+                "health": (df["health_status"] != HEALTH[0]).to_numpy(),
+                "source": df["source"].map({s: i for i, s in enumerate(SOURCES)}).fillna(0).to_numpy()
+            }
+            days = df["timestamp"].str[:10].to_numpy()
+            for day in np.unique(days):
+                mask = days == day
+                self.append_columns(day, {name: col[mask] for name, col in columns.items()})
+            self.merge_closed()
+
+    def _write_part(self, day_dir, name, columns, covered=()):
+        tmp_dir = os.path.join(day_dir, "." + name)
+        os.makedirs(tmp_dir, exist_ok=True)
+        for column, dtype in ARCHIVE_COLUMNS.items():
+            np.save(os.path.join(tmp_dir, column + ".npy"), np.asarray(columns[column], dtype=dtype))
+        if covered:
+            with open(os.path.join(tmp_dir, "covered.txt"), "w") as f:
+                f.write("".join(c + "\n" for c in covered))
+        os.rename(tmp_dir, os.path.join(day_dir, name))
+
+    def append_columns(self, day, columns):
+        """Write one immutable part for `day` from already-encoded columns."""
+        day_dir = os.path.join(self.root, day)
+        os.makedirs(day_dir, exist_ok=True)
+        with self.lock:
+            # Unique without listing the day: time + pid
+            self._write_part(day_dir, f"part-{time.time_ns():020d}-{os.getpid()}", columns)
+            self._touch()
+            self._written[day] = self._written.get(day, 0) + 1
+            if self._written[day] >= MERGE_EVERY:
+                self.merge(day)
+
+    def _touch(self):
+        with open(self._stamp, "a"):
+            pass
+        now = time.time_ns()
+        os.utime(self._stamp, ns=(now, now))
+
+    def version(self):
+        """Changes whenever a part is added, in this or any other process."""
+        return file_token(self._stamp)
+
+    # ---------- merging ----------
+    def _plan(self, day):
+        """(newest base part or None, parts it does not cover) of a day."""
+        day_dir = os.path.join(self.root, day)
+        names = os.listdir(day_dir)
+        bases = sorted(n for n in names if n.startswith("base-"))
+        base = bases[-1] if bases else None
+        covered = set()
+        if base is not None:
+            with open(os.path.join(day_dir, base, "covered.txt")) as f:
+                covered = set(f.read().splitlines())
+        parts = sorted(n for n in names if n.startswith("part-") and n not in covered)
+        return base, parts
+
+    def merge(self, day):
+        """Fold a day's parts (and its previous base) into one new base part."""
+        day_dir = os.path.join(self.root, day)
+        with self.lock:
+            self._written[day] = 0
+            base, parts = self._plan(day)
+            if not parts:
+                return
+            sources = ([base] if base else []) + parts
+            columns = {
+                column: np.concatenate([
+                    np.load(os.path.join(day_dir, part, column + ".npy")) for part in sources
+                ])
+                for column in ARCHIVE_COLUMNS
+            }
+            self._write_part(day_dir, f"base-{time.time_ns():020d}", columns, covered=parts)
+            # Readers now take the new base and skip everything it replaced
+            for name in sources:
+                shutil.rmtree(os.path.join(day_dir, name), ignore_errors=True)
+
+    def merge_closed(self):
+        """Merge every day before today that still has loose parts (once a day)."""
+        today = date.today().isoformat()
+        if self._closed_through == today:
+            return
+        with self.lock:
+            for day in self.days(start=self._closed_through, end=days_back(1)):
+                if len(self._plan(day)[1]) > 0:
+                    self.merge(day)
+            self._closed_through = today
+
+    # ---------- reading ----------
+    def days(self, start=None, end=None):
+        """Partition days within [start, end] (ISO date strings), sorted."""
+        out = []
+        for name in os.listdir(self.root):
+            if len(name) == 10 and name[4] == "-" and os.path.isdir(os.path.join(self.root, name)):
+                if (start is None or name >= start) and (end is None or name <= end):
+                    out.append(name)
+        return sorted(out)
+
+    def scan(self, day, columns):
+        """Yield {column: memory-mapped array} for each part of a day."""
+        day_dir = os.path.join(self.root, day)
+        for attempt in range(3):
+            try:
+                base, parts = self._plan(day)
+                loaded = [
+                    {
+                        name: np.load(os.path.join(day_dir, part, name + ".npy"), mmap_mode="r")
+                        for name in columns
+                    }
+                    for part in ([base] if base else []) + parts
+                ]
+            except FileNotFoundError:
+                continue   # a merge replaced parts while we listed them; plan again
+            yield from loaded
+            return
+        raise RuntimeError(f"archive day {day} kept changing while being read")
+
+    def _animal_code(self, animal_id):
+        with self._read_lock:
+            self.animals.refresh()
+            return self.animals.codes.get(animal_id)
+
+    def attendance_per_day(self, start=None, end=None):
+        """DataFrame(day, animals): distinct animals sighted per day."""
+        rows = []
+        for day in self.days(start, end):
+            seen = np.zeros(0, dtype=bool)
+            for part in self.scan(day, ["animal"]):
+                codes = part["animal"]
+                if len(codes) == 0:
+                    continue
+                counts = np.bincount(codes)
+                if len(counts) > len(seen):
+                    seen = np.pad(seen, (0, len(counts) - len(seen)))
+                seen[:len(counts)] |= counts > 0
+            rows.append((day, int(seen.sum())))
+        return pd.DataFrame(rows, columns=["day", "animals"])
+
+    def health_trend(self, start=None, end=None, animal_id=None):
+        """DataFrame(day, sightings, unhealthy, unhealthy_share) per day."""
+        code = None
+        if animal_id is not None:
+            code = self._animal_code(animal_id)
+            if code is None:
+                return pd.DataFrame(columns=["day", "sightings", "unhealthy", "unhealthy_share"])
+
+        rows = []
+        for day in self.days(start, end):
+            total = unhealthy = 0
+            columns = ["health"] if code is None else ["health", "animal"]
+            for part in self.scan(day, columns):
+                health = part["health"]
+                if code is not None:
+                    health = health[part["animal"] == code]
+                total += len(health)
+                unhealthy += int(np.count_nonzero(health))
+            if total:
+                rows.append((day, total, unhealthy, unhealthy / total))
+        return pd.DataFrame(rows, columns=["day", "sightings", "unhealthy", "unhealthy_share"])
+
+
+def days_back(n):
+    """ISO date string n days before today."""
+    return (date.today() - timedelta(days=n)).isoformat()
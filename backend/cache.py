@@ -0,0 +1,192 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from backend import metrics
+from backend.storage import COLUMNS, new_row, normalize
+
+
+READ_MS = metrics.histogram("farm_db_read_ms", "Herd reads (cache hit or reload)")
+WRITE_MS = metrics.histogram("farm_db_write_ms", "Herd writes through to the backend")
+LOAD_MS = metrics.histogram("farm_db_load_ms", "Full herd loads from the backend")
+
+
+class HerdCache:
+    """
+    Process-wide in-memory herd table shared by all Streamlit sessions.
+
+    Rows live in a dict indexed by animal_id. Writes go to memory and
+    straight through to the backend; reads are served from memory until the
+    backing file's identity (inode / mtime / size) changes underneath us,
+    e.g. because another process wrote to it.
+
+    Writers hold the backend's file lock and first check that the file is
+    still the version the cache was built from; if another session got
+    there first, the cache reloads before applying the change, so
+    concurrent writes are never lost.
+    """
+
+    def __init__(self, backend, check_interval=0.5):
+        self.backend = backend
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._rows = None
+        self._frame = None
+        self._token = None
+        self._checked_at = 0.0
+        self.version = 0   # bumped whenever the rows may have changed
+
+    # ---------- invalidation ----------
+    def _stale(self):
+        if self._rows is None:
+            return True
+
+        # stat() at most every check_interval seconds
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        return self.backend.token() != self._token
+
+    def _reload(self):
+        self.misses += 1
+        self._token = self.backend.token()
+        with LOAD_MS.time():
+            df = self.backend.load()
+        self._rows = {
+            row["animal_id"]: row for row in df[COLUMNS].to_dict("records")
+        }
+        self._frame = df[COLUMNS]
+        self._checked_at = time.monotonic()
+        self.version += 1
+
+    def _ensure(self):
+        if self._stale():
+            self._reload()
+        else:
+            self.hits += 1
+
+    @contextmanager
+    def _writing(self):
+        """Write path: writer lock + optimistic version check."""
+        with self.backend.lock:
+            if self._rows is None or self.backend.token() != self._token:
+                self._reload()
+            yield
+
+    def invalidate(self):
+        with self._lock:
+            self._rows = None
+            self._frame = None
+            self.version += 1
+
+    # ---------- reads ----------
+    def _build_frame(self):
+        if self._frame is None:
+            self._frame = pd.DataFrame.from_records(
+                list(self._rows.values()), columns=COLUMNS
+            )
+        return self._frame
+
+    def frame(self):
+        """Whole herd as a DataFrame. Shared — callers must not mutate it."""
+        with READ_MS.time(), self._lock:
+            self._ensure()
+            return self._build_frame()
+
+    def get(self, animal_id):
+        with READ_MS.time(), self._lock:
+            self._ensure()
+            row = self._rows.get(animal_id)
+            return None if row is None else dict(row)
+
+    def current_version(self):
+        """Version of the rows after picking up changes made by other processes."""
+        with self._lock:
+            self._ensure()
+            return self.version
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "animals": 0 if self._rows is None else len(self._rows)
+        }
+
+    # ---------- write-through ----------
+    def _commit(self, write):
+        # Full-rewrite backends (CSV) are written from memory, never re-read
+        self._frame = None
+        self.version += 1
+        with WRITE_MS.time():
+            if self.backend.full_rewrite:
+                self.backend.save(self._build_frame())
+            else:
+                write()
+        self._token = self.backend.token()
+
+    def upsert_many(self, detections, now):
+        with self._lock, self._writing():
+            for animal_id, animal_type, health_status in detections:
+                row = self._rows.get(animal_id)
+                if row is None:
+                    self._rows[animal_id] = new_row(animal_id, animal_type, health_status, now)
+                else:
+                    row["health_status"] = health_status
+                    row["last_seen"] = now
+            self._commit(lambda: self.backend.upsert_many(detections, now))
+
+    def apply(self, fold):
+        """
+        Write fold(rows) → {animal_id: new row} through as whole rows,
+        computed under the writer lock on the current version.
+        """
+        with self._lock, self._writing():
+            updates = fold(self._rows)
+            if updates:
+                self._rows.update(updates)
+                self._commit(lambda: self.backend.put_many(list(updates.values())))
+            return updates
+
+    def overlay(self, fold):
+        """
+        Herd frame with fold(rows) laid over it, without writing anything —
+        for showing changes that are not committed yet.
+        """
+        with self._lock:
+            self._ensure()
+            updates = fold(self._rows)
+            if not updates:
+                return self._build_frame()
+            rows = {**self._rows, **updates}
+            return pd.DataFrame.from_records(list(rows.values()), columns=COLUMNS)
+
+    def delete(self, animal_id):
+        self.delete_many([animal_id])
+
+    def delete_many(self, animal_ids):
+        animal_ids = list(animal_ids)
+        with self._lock, self._writing():
+            for animal_id in animal_ids:
+                self._rows.pop(animal_id, None)
+            self._commit(lambda: self.backend.delete_many(animal_ids))
+
+    def rename(self, animal_id, new_name):
+        with self._lock, self._writing():
+            row = self._rows.get(animal_id)
+            if row is None or row["display_name"] == new_name:
+                return
+            row["display_name"] = new_name
+            self._commit(lambda: self.backend.rename(animal_id, new_name))
+
+    def save(self, df):
+        with self._lock, self.backend.lock:
+            self.backend.save(normalize(df.copy()))
+            self.invalidate()
+
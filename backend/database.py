@@ -1,62 +1,259 @@
-import pandas as pd
 import os
+import threading
 from datetime import datetime
 
-DB_FILE = "records.csv"
+from backend import metrics
+from backend.alerts import AlertIndex
+from backend.archive import SightingArchive, days_back
+from backend.cache import HerdCache
+from backend.events import Compactor, SightingLog, fold_sightings
+from backend.herd_view import HerdView
+from backend.storage import (
+    COLUMNS,
+    CsvBackend,
+    SqliteBackend,
+    migrate_csv_to_sqlite
+)
 
-COLUMNS = [
-    "animal_id",      # internal only
-    "animal_type",    # Cow, Goat, etc
-    "display_name",   # Farmer editable
-    "attendance",     # integer
-    "health_status",  # Healthy / Needs Vet Support
-    "last_seen"       # timestamp
-]
+# "sqlite" (default) or "csv"
+DB_BACKEND = os.environ.get("FARM_DB_BACKEND", "sqlite")
+
+DB_FILE = "records.csv"       # CSV backend + import/export format
+SQLITE_FILE = "records.db"
+SIGHTINGS_FILE = "sightings.log"
+ARCHIVE_DIR = "archive"           # columnar sighting history
+ALERTS_FILE = "alerts.json"       # open health / behavior alerts
+
+COMPACT_INTERVAL = 5.0        # seconds between background compactions
+
+# Streamlit sessions run on concurrent threads: the lazy singletons below
+# are created under this lock (checked again inside), so two first calls
+# never build two logs / compactors / caches. Re-entrant: get_cache()
+# builds the backend, get_alerts() reads the cache.
+_init_lock = threading.RLock()
+
+_backends = {}
+
+def get_backend():
+    """
+    Storage engine selected by DB_BACKEND. Backends are cached per file so
+    the SQLite connections and prepared statements are reused.
+    """
+    key = (DB_BACKEND, SQLITE_FILE if DB_BACKEND == "sqlite" else DB_FILE)
+    if key not in _backends:
+        with _init_lock:
+            if key not in _backends:
+                if DB_BACKEND == "sqlite":
+                    # First start on SQLite → pull in the existing records.csv once
+                    migrate_csv_to_sqlite(DB_FILE, SQLITE_FILE)
+                    _backends[key] = SqliteBackend(SQLITE_FILE)
+                elif DB_BACKEND == "csv":
+                    _backends[key] = CsvBackend(DB_FILE)
+                else:
+                    raise ValueError(f"Unknown FARM_DB_BACKEND: {DB_BACKEND}")
+    return _backends[key]
+
+_caches = {}
+
+def get_cache():
+    """Process-wide herd cache over the active backend (shared by sessions)."""
+    backend = get_backend()
+    if id(backend) not in _caches:
+        with _init_lock:
+            if id(backend) not in _caches:
+                cache = _caches[id(backend)] = HerdCache(backend)
+                metrics.gauge("farm_herd_cache_hit_rate", "Herd reads served from memory",
+                              fn=lambda: cache.stats()["hit_rate"])
+                metrics.gauge("farm_herd_animals", "Animals in the herd table",
+                              fn=lambda: cache.stats()["animals"])
+    return _caches[id(backend)]
+
+def cache_stats():
+    return get_cache().stats()
+
+_logs = {}
+
+def get_log():
+    """
+    Sighting log for this process; the first call also starts the
+    background compactor that folds it into the herd table.
+    """
+    if SIGHTINGS_FILE not in _logs:
+        with _init_lock:
+            if SIGHTINGS_FILE not in _logs:
+                log = SightingLog(SIGHTINGS_FILE)
+                _logs[SIGHTINGS_FILE] = log
+                metrics.gauge("farm_sightings_buffered", "Sightings not yet written to the log",
+                              fn=log.buffered)
+                Compactor(compact_sightings, COMPACT_INTERVAL).start()
+    return _logs[SIGHTINGS_FILE]
+
+def record_sightings(sightings):
+    """
+    O(1) ingest path for detections: buffered append to the sighting log.
+    sightings: iterable of dicts with animal_id, animal_type, confidence,
+    health_status, source, bbox (and optionally timestamp)
+    """
+    sightings = list(sightings)
+    if sightings:
+        get_log().append(sightings)
+
+def flush_sightings():
+    """Write this process's buffered sightings to the log now (durability point)."""
+    get_log().flush()
+
+def compact_sightings():
+    """Fold logged sightings into the herd table + archive now. Returns #events."""
+    return get_log().compact(get_cache(), get_archive(), get_alerts())
+
+_archives = {}
+
+def get_archive():
+    if ARCHIVE_DIR not in _archives:
+        with _init_lock:
+            if ARCHIVE_DIR not in _archives:
+                _archives[ARCHIVE_DIR] = SightingArchive(ARCHIVE_DIR)
+    return _archives[ARCHIVE_DIR]
+
+_alerts = {}
+
+def get_alerts():
+    """
+    Alert index kept up to date by every herd write. Built from the herd
+    once (first start with existing records), incremental afterwards.
+    """
+    if ALERTS_FILE not in _alerts:
+        with _init_lock:
+            if ALERTS_FILE not in _alerts:
+                alerts = AlertIndex(ALERTS_FILE)
+                if not alerts.exists:
+                    with alerts.lock:
+                        if not alerts.exists:
+                            alerts.rebuild(get_cache().frame().to_dict("records"))
+                _alerts[ALERTS_FILE] = alerts
+    return _alerts[ALERTS_FILE]
+
+def alerts_since(since):
+    """Alerts raised or escalated after `since` ("%Y-%m-%d %H:%M:%S", wall clock)."""
+    return get_alerts().alerts_since(since)
+
+_histories = {"version": None, "results": {}}
+
+def _archive_query(name, **kwargs):
+    """Archive query result, computed once per archive change (new part)."""
+    archive = get_archive()
+    version = (ARCHIVE_DIR, archive.version())
+    if _histories["version"] != version:
+        _histories["version"] = version
+        _histories["results"] = {}
+    key = (name, tuple(sorted(kwargs.items())))   # kwargs hold the start day
+    if key not in _histories["results"]:
+        _histories["results"][key] = getattr(archive, name)(**kwargs)
+    return _histories["results"][key]
+
+def attendance_history(days=30):
+    """Distinct animals seen per day over the last `days` days."""
+    return _archive_query("attendance_per_day", start=days_back(days))
+
+def health_history(days=30, animal_id=None):
+    """Per-day share of sightings flagged "Needs Vet Support"."""
+    return _archive_query("health_trend", start=days_back(days), animal_id=animal_id)
+
+def set_behaviors(behaviors):
+    """
+    Attach per-animal behavior labels: {animal_id: label}. Pending
+    sightings are compacted first so animals first seen in the same
+    video already have a row.
+    """
+    if not behaviors:
+        return
+    compact_sightings()
+    updates = get_cache().apply(lambda rows: {
+        animal_id: dict(rows[animal_id], behavior=label)
+        for animal_id, label in behaviors.items()
+        if animal_id in rows
+    })
+    get_alerts().observe(updates.values())
 
 def init_db():
-    if not os.path.exists(DB_FILE):
-        df = pd.DataFrame(columns=COLUMNS)
-        df.to_csv(DB_FILE, index=False)
+    get_backend().init()
 
 def load_db():
-    init_db()
-    return pd.read_csv(DB_FILE)
+    return get_backend().load()
 
 def save_db(df):
-    df.to_csv(DB_FILE, index=False)
+    get_cache().save(df)
+
+def get_animal(animal_id):
+    """Single animal as a dict, served from the herd cache, or None."""
+    return get_cache().get(animal_id)
+
+def upsert_many(detections):
+    """
+    Batch ingest: all detections of a frame (or a whole video) are merged
+    and committed once, instead of one write per box.
+    detections: iterable of (animal_id, animal_type, health_status)
+    """
+    detections = list(detections)
+    if not detections:
+        return
 
-def upsert_animal(animal_id, animal_type, health_status):
-    df = load_db()
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cache = get_cache()
+    cache.upsert_many(detections, now)
+    get_alerts().observe(
+        row for row in (cache.get(animal_id) for animal_id, _, _ in detections) if row
+    )
 
-    if animal_id in df["animal_id"].values:
-        # Animal already exists → update last seen only
-        idx = df[df["animal_id"] == animal_id].index[0]
-        df.at[idx, "last_seen"] = now
-        df.at[idx, "health_status"] = health_status
-    else:
-        # New animal → add row
-        new_row = {
-            "animal_id": animal_id,
-            "animal_type": animal_type,
-            "display_name": animal_type,
-            "attendance": 1,
-            "health_status": health_status,
-            "last_seen": now
-        }
-        df.loc[len(df)] = new_row
-
-    save_db(df)
+def upsert_animal(animal_id, animal_type, health_status):
+    upsert_many([(animal_id, animal_type, health_status)])
 
 def get_all_animals():
-    return load_db()
+    """
+    Whole herd: the cached snapshot plus sightings not compacted yet.
+    A warm cache never reads the herd table from disk.
+    """
+    pending = get_log().pending()
+    return get_cache().overlay(lambda rows: fold_sightings(rows, pending))
 
 def delete_animal(animal_id):
-    df = load_db()
-    df = df[df["animal_id"] != animal_id]
-    save_db(df)
+    delete_many([animal_id])
 
 def update_display_name(animal_id, new_name):
-    df = load_db()
-    df.loc[df["animal_id"] == animal_id, "display_name"] = new_name
-    save_db(df)
+    get_cache().rename(animal_id, new_name)
+
+def delete_many(animal_ids):
+    """Remove several animals in one commit."""
+    animal_ids = list(animal_ids)
+    if animal_ids:
+        compact_sightings()
+        get_cache().delete_many(animal_ids)
+        get_alerts().discard(animal_ids)
+
+def rename_many(names):
+    """Apply {animal_id: new display name} in one commit."""
+    if not names:
+        return
+    # Animals only seen in not-yet-compacted sightings need their row first
+    compact_sightings()
+    get_cache().apply(lambda rows: {
+        animal_id: dict(rows[animal_id], display_name=name)
+        for animal_id, name in names.items()
+        if animal_id in rows and rows[animal_id]["display_name"] != name
+    })
+
+def herd_version():
+    """Changes whenever get_all_animals() may return something different."""
+    return (get_cache().current_version(), len(get_log().pending()))
+
+_views = {}
+
+def get_herd_view():
+    """Indexed, aggregated herd for the dashboard — rebuilt once per version."""
+    key = id(get_cache())   # versions are per cache (i.e. per store)
+    version = herd_version()
+    view = _views.get(key)
+    if view is None or view.version != version:
+        view = HerdView(get_all_animals(), version)
+        _views[key] = view
+    return view
@@ -0,0 +1,229 @@
+import csv
+import io
+import os
+import threading
+import time
+from datetime import datetime
+
+from backend import metrics
+from backend.locking import FileLock, atomic_write
+from backend.periodic import PeriodicThread
+from backend.storage import new_row
+
+SIGHTINGS = metrics.counter("farm_sightings_total", "Sightings appended to the log")
+FLUSH_MS = metrics.histogram("farm_log_flush_ms", "Sighting log buffer writes")
+COMPACT_MS = metrics.histogram("farm_compaction_ms", "Sighting log compactions")
+
+SIGHTING_FIELDS = [
+    "animal_id",
+    "animal_type",
+    "timestamp",      # "%Y-%m-%d %H:%M:%S"
+    "confidence",     # detector confidence 0..1
+    "health_status",  # Healthy / Needs Vet Support
+    "source",         # image / video / camera
+    "bbox",           # "x1 y1 x2 y2"
+    "phash",          # perceptual hash of the crop (hex)
+    "camera_id"       # stream that produced it (live cameras; "" otherwise)
+]
+
+
+def _format(sightings):
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    for s in sightings:
+        writer.writerow([
+            s["animal_id"],
+            s["animal_type"],
+            s["timestamp"],
+            f"{float(s.get('confidence', 0)):.3f}",
+            s["health_status"],
+            s.get("source", ""),
+            " ".join(str(int(v)) for v in s.get("bbox") or ()),
+            s.get("phash", ""),
+            s.get("camera_id") or ""
+        ])
+    return out.getvalue()
+
+
+def _parse(text):
+    return [dict(zip(SIGHTING_FIELDS, row)) for row in csv.reader(io.StringIO(text)) if row]
+
+
+def fold_sightings(rows, events):
+    """
+    Fold sighting events into herd rows. Returns {animal_id: new row}
+    for every animal touched; `rows` itself is not modified.
+
+    attendance counts the distinct days an animal was seen, last_seen /
+    health_status follow the newest sighting, first_seen the oldest.
+    """
+    updates = {}
+    for ev in events:
+        animal_id = ev["animal_id"]
+        ts = ev["timestamp"]
+        row = updates.get(animal_id)
+        if row is None and animal_id in rows:
+            row = dict(rows[animal_id])
+
+        if row is None:
+            updates[animal_id] = new_row(
+                animal_id, ev["animal_type"], ev["health_status"], ts,
+                phash=ev.get("phash") or None,
+                camera_id=ev.get("camera_id") or None
+            )
+            continue
+
+        last_seen = str(row["last_seen"])
+        if ts[:10] > last_seen[:10]:
+            row["attendance"] = int(row["attendance"]) + 1
+        if ts >= last_seen:
+            row["last_seen"] = ts
+            row["health_status"] = ev["health_status"]
+            if ev.get("camera_id"):
+                row["camera_id"] = ev["camera_id"]
+        if ts < str(row["first_seen"]):
+            row["first_seen"] = ts
+        updates[animal_id] = row
+    return updates
+
+
+class SightingLog:
+    """
+    Append-only sighting log (CSV lines) next to the herd table.
+
+    append() only buffers in memory; the buffer is written with one
+    O_APPEND write when it grows past flush_every lines or flush_interval
+    seconds. Compaction folds everything after the committed byte offset
+    into the herd snapshot and then advances the offset, so ingest cost
+    never depends on herd size.
+    """
+
+    def __init__(self, path, flush_every=256, flush_interval=1.0, check_interval=0.5):
+        self.path = path
+        self.offset_path = path + ".offset"
+        self.lock = FileLock(path + ".lock")
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.check_interval = check_interval
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._tail = None
+        self._tail_checked_at = 0.0
+        self._tail_lock = threading.Lock()   # compact() resets the tail from another thread
+
+    # ---------- writing ----------
+    def append(self, sightings):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        events = [dict(s, timestamp=s.get("timestamp") or now) for s in sightings]
+        SIGHTINGS.inc(len(events))
+        with self._buffer_lock:
+            self._buffer.extend(events)
+            due = (
+                len(self._buffer) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def buffered(self):
+        """Sightings appended but not yet written to the file."""
+        with self._buffer_lock:
+            return len(self._buffer)
+
+    def flush(self):
+        with self._buffer_lock:
+            events, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        if not events:
+            return
+        with FLUSH_MS.time():
+            data = _format(events)
+            with self.lock:
+                with open(self.path, "a", newline="") as f:
+                    f.write(data)
+
+    # ---------- reading ----------
+    def committed_offset(self):
+        try:
+            with open(self.offset_path) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def read_from(self, offset):
+        """Complete events after `offset` and the byte offset they end at."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+        end = data.rfind(b"\n") + 1
+        return _parse(data[:end].decode("utf-8")), offset + end
+
+    def pending(self):
+        """
+        Events not yet compacted into the herd table: the on-disk tail after
+        the committed offset plus this process's unflushed buffer. The disk
+        tail is re-read only when the log or the offset file changes.
+        """
+        now = time.monotonic()
+        with self._tail_lock:
+            tail = self._tail
+            if tail is None or now - self._tail_checked_at >= self.check_interval:
+                self._tail_checked_at = now
+                key = (_size(self.path), self.committed_offset())
+                if tail is None or tail[0] != key:
+                    events, _ = self.read_from(key[1])
+                    tail = self._tail = (key, events)
+
+        with self._buffer_lock:
+            buffered = list(self._buffer)
+        return tail[1] + buffered
+
+    # ---------- compaction ----------
+    def compact(self, cache, archive=None, alerts=None, rotate_bytes=8 * 1024 * 1024):
+        """
+        Fold the un-compacted tail into the herd snapshot (and the history
+        archive and alert index, if given). Returns #events. Once everything is archived and
+        the log is larger than rotate_bytes, it is truncated and starts over.
+        """
+        self.flush()
+        with COMPACT_MS.time(), self.lock:
+            offset = self.committed_offset()
+            events, end = self.read_from(offset)
+            if events:
+                updates = cache.apply(lambda rows: fold_sightings(rows, events))
+                if alerts is not None:
+                    alerts.observe(updates.values())
+                    alerts.flush()   # last_flagged refreshes: once per compaction
+                if archive is not None:
+                    archive.append(events)
+            if archive is not None and end >= rotate_bytes and end == _size(self.path):
+                # Offset first: a crash before the truncate leaves offset 0
+                # over a full log (re-folded), never an offset past the end
+                # of a new, shorter log (its events silently skipped)
+                atomic_write(self.offset_path, lambda f: f.write("0"))
+                with open(self.path, "w"):
+                    pass
+            elif end != offset:
+                atomic_write(self.offset_path, lambda f: f.write(str(end)))
+        with self._tail_lock:
+            self._tail = None
+        return len(events)
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return -1
+
+
+class Compactor(PeriodicThread):
+    """Background thread that compacts the sighting log every `interval` s."""
+
+    def __init__(self, compact, interval=5.0):
+        # A failed compaction leaves its events in the log for the next tick
+        super().__init__(compact, interval, name="sighting-compactor")
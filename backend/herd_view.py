@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 24
+UNHEALTHY = "Needs Vet Support"
+SORT_COLUMNS = ["last_seen", "display_name", "attendance", "animal_type", "health_status"]
+
+
+class HerdView:
+    """
+    Read-only, indexed snapshot of the herd for the dashboard.
+
+    Built once per herd version: type / health columns are encoded so a
+    filter is one vectorized mask, each sort order is computed the first
+    time it is asked for and reused, and the summary aggregates are
+    counted up front. A page request then only materializes the rows it
+    shows, so its cost does not grow with the herd.
+    """
+
+    def __init__(self, df, version=None):
+        self.version = version
+        self.df = df.reset_index(drop=True)
+        self._orders = {}
+        self._types, self._type_codes = _encode(self.df["animal_type"])
+        self._health, self._health_codes = _encode(self.df["health_status"])
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        seen = self.df["last_seen"].astype(str)
+        self.summary = {
+            "total": len(self.df),
+            "by_type": {
+                t: int(n) for t, n in zip(self._types, np.bincount(self._type_codes, minlength=len(self._types)))
+            },
+            "needs_vet": int((self.df["health_status"] == UNHEALTHY).sum()),
+            "seen_today": int(seen.str.startswith(today).sum())
+        }
+
+    @property
+    def animal_types(self):
+        return list(self._types)
+
+    @property
+    def health_statuses(self):
+        return list(self._health)
+
+    def _order(self, sort, descending):
+        """Row positions sorted by a column; computed once per column."""
+        if sort not in self._orders:
+            values = self.df[sort]
+            if sort == "attendance":
+                values = pd.to_numeric(values, errors="coerce").fillna(0)
+            else:
+                values = values.fillna("").astype(str).str.lower()
+            self._orders[sort] = np.argsort(values.to_numpy(), kind="stable")
+        order = self._orders[sort]
+        return order[::-1] if descending else order
+
+    def _mask(self, types, health):
+        mask = np.ones(len(self.df), dtype=bool)
+        if types:
+            mask &= np.isin(self._type_codes, _codes(self._types, types))
+        if health:
+            mask &= np.isin(self._health_codes, _codes(self._health, health))
+        return mask
+
+    def count(self, types=None, health=None):
+        """Number of animals matching the filters."""
+        if not types and not health:
+            return len(self.df)
+        return int(self._mask(types, health).sum())
+
+    def page(self, types=None, health=None, sort="last_seen", descending=True,
+             page=0, page_size=PAGE_SIZE):
+        """
+        (rows of one page, number of matching animals). Empty `types` /
+        `health` mean no filter on that column.
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column: {sort}")
+        order = self._order(sort, descending)
+        if types or health:
+            order = order[self._mask(types, health)[order]]
+        start = max(0, page) * page_size
+        return self.df.iloc[order[start:start + page_size]], len(order)
+
+
+def _encode(column):
+    """(sorted distinct values, integer code per row); missing → ""."""
+    codes, values = pd.factorize(column.fillna("").astype(str), sort=True)
+    return list(values), codes
+
+
+def _codes(values, wanted):
+    return [values.index(v) for v in wanted if v in values]
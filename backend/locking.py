@@ -0,0 +1,94 @@
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Read once: os.umask() can only be queried by setting it, which would
+# race with other threads creating files
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class FileLock:
+    """
+    Writer lock shared by threads (in-process RLock) and by processes
+    (advisory lock on a side file). Re-entrant within a thread, so a
+    cache write can call into a backend write that locks again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX)
+                else:
+                    msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+            except BaseException:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def atomic_write(path, write):
+    """
+    Write a file via a temp file in the same directory + os.replace, so
+    readers see either the old or the new file, never a truncated one.
+    write: callable receiving the open text file
+
+    The file keeps the target's permissions (a new file gets the usual
+    0666 & ~umask), not mkstemp's private 0600.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "w", newline="") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
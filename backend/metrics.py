@@ -0,0 +1,200 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.locking import atomic_write
+from backend.periodic import PeriodicThread
+
+# Upper bounds of the latency buckets in milliseconds (+Inf is implicit)
+MS_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+COUNT_BUCKETS = [0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100]
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+    def snapshot(self):
+        return {"value": self.value}
+
+
+class Gauge:
+    """Last value set, or — with `fn` — whatever fn() returns when read."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help="", fn=None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def read(self):
+        if self.fn is None:
+            return self.value
+        try:
+            return self.fn()
+        except Exception:
+            return float("nan")
+
+    def snapshot(self):
+        return {"value": self.read()}
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram: observe() is a bisect and two additions under
+    a lock, so it can sit in per-frame loops. Quantiles are estimated by
+    interpolating inside the bucket that holds them.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help="", buckets=MS_BUCKETS):
+        self.name = name
+        self.help = help
+        self.bounds = list(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value, n=1):
+        """Record `value` n times (e.g. a batch's per-frame latency)."""
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += n
+            self.count += n
+            self.sum += value * n
+            if value > self.max:
+                self.max = value
+
+    @contextmanager
+    def time(self):
+        """Observe the block's duration in milliseconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe((time.perf_counter() - start) * 1000)
+
+    def quantile(self, q):
+        with self._lock:
+            counts, total, top = list(self.counts), self.count, self.max
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, c in enumerate(counts):
+            if c and seen + c >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = min(self.bounds[i], top) if i < len(self.bounds) else top
+                return lower + (upper - lower) * (rank - seen) / c
+            seen += c
+        return top
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max
+        }
+
+
+class Registry:
+    """Named metrics of this process; get-or-create, so modules can share them."""
+
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, **kwargs)
+            return metric
+
+    def counter(self, name, help=""):
+        return self._get(Counter, name, help=help)
+
+    def gauge(self, name, help="", fn=None):
+        gauge = self._get(Gauge, name, help=help)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name, help="", buckets=MS_BUCKETS):
+        return self._get(Histogram, name, help=help, buckets=buckets)
+
+    # ---------- export ----------
+    def snapshot(self):
+        with self._lock:
+            metrics = list(self.metrics.values())
+        return {m.name: dict(m.snapshot(), type=m.kind) for m in metrics}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (e.g. for node_exporter's textfile collector)."""
+        with self._lock:
+            metrics = sorted(self.metrics.values(), key=lambda m: m.name)
+        lines = []
+        for m in metrics:
+            if m.help:
+                lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            if m.kind == "histogram":
+                with m._lock:
+                    counts, total, value_sum = list(m.counts), m.count, m.sum
+                cumulative = 0
+                for bound, c in zip(m.bounds + ["+Inf"], counts):
+                    cumulative += c
+                    lines.append(f'{m.name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{m.name}_sum {value_sum}")
+                lines.append(f"{m.name}_count {total}")
+            elif m.kind == "counter":
+                lines.append(f"{m.name} {m.value}")
+            else:
+                lines.append(f"{m.name} {m.read()}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write all metrics to `path`: JSON for *.json, Prometheus text otherwise."""
+        text = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        atomic_write(path, lambda f: f.write(text))
+
+
+REGISTRY = Registry()
+
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+
+class Exporter(PeriodicThread):
+    """Background thread that rewrites a metrics file every `interval` s."""
+
+    def __init__(self, path, interval=15.0, registry=REGISTRY):
+        super().__init__(lambda: registry.write(path), interval, name="metrics-exporter")
+        self.path = path
+        self.registry = registry
@@ -0,0 +1,27 @@
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class PeriodicThread(threading.Thread):
+    """
+    Daemon thread that calls fn() every `interval` s until stop(). A
+    failing call is logged and retried on the next tick.
+    """
+
+    def __init__(self, fn, interval, name=None):
+        super().__init__(name=name, daemon=True)
+        self.fn = fn
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.fn()
+            except Exception:
+                log.exception("%s: periodic call failed", self.name)
+
+    def stop(self):
+        self._stop_event.set()
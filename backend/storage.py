@@ -0,0 +1,326 @@
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from backend.locking import FileLock, atomic_write
+
+COLUMNS = [
+    "animal_id",      # internal only
+    "animal_type",    # Cow, Goat, etc
+    "display_name",   # Farmer editable
+    "attendance",     # integer
+    "health_status",  # Healthy / Needs Vet Support
+    "last_seen",      # timestamp
+    "first_seen",     # timestamp
+    "phash",          # perceptual hash of the first crop (hex), for re-ID
+    "behavior",       # Low Activity / Normal Behavior / High Restlessness
+    "camera_id"       # camera of the latest sighting (live streams only)
+]
+
+# SQLite column types (everything else is TEXT)
+COLUMN_TYPES = {"attendance": "INTEGER"}
+
+DETECTION_COLUMNS = ["animal_id", "animal_type", "health_status"]
+
+
+def new_row(animal_id, animal_type, health_status, now, **extra):
+    """Herd row for a first sighting; columns not given default to None."""
+    row = dict.fromkeys(COLUMNS)
+    row.update(
+        animal_id=animal_id,
+        animal_type=animal_type,
+        display_name=animal_type,
+        attendance=1,
+        health_status=health_status,
+        last_seen=now,
+        first_seen=now
+    )
+    row.update(extra)
+    return row
+
+
+def normalize(df):
+    """Bring a table written by an older version up to COLUMNS."""
+    for col in COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    df["first_seen"] = df["first_seen"].fillna(df["last_seen"])
+    return df[COLUMNS]
+
+
+def merge_detections(df, detections, now):
+    """
+    Fold a batch of (animal_id, animal_type, health_status) detections
+    into the herd table in one vectorized pass. Later detections of the
+    same animal win, exactly as repeated upsert_animal calls would.
+    """
+    batch = pd.DataFrame(list(detections), columns=DETECTION_COLUMNS)
+    if batch.empty:
+        return df
+
+    # One row per animal, first-seen order, latest values
+    batch = batch.groupby("animal_id", sort=False, as_index=False).last()
+    known = batch["animal_id"].isin(df["animal_id"])
+
+    # Animals already in the herd → refresh last seen + health
+    updates = batch[known].set_index("animal_id")["health_status"]
+    if not updates.empty:
+        df = df.set_index("animal_id")
+        df.loc[updates.index, "health_status"] = updates
+        df.loc[updates.index, "last_seen"] = now
+        df = df.reset_index()
+
+    # New animals → append rows
+    new_rows = batch[~known]
+    new_rows = new_rows.assign(
+        display_name=new_rows["animal_type"],
+        attendance=1,
+        last_seen=now,
+        first_seen=now
+    )
+    if not new_rows.empty:
+        df = pd.concat([df, new_rows.reindex(columns=COLUMNS)], ignore_index=True)
+
+    return df[COLUMNS]
+
+
+def file_token(path):
+    """(inode, mtime, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+# ===================== CSV BACKEND =====================
+
+class CsvBackend:
+    """
+    Flat-file herd table. Every change is a full load + rewrite, so it is
+    kept mainly as the import/export format and for tiny setups.
+    """
+
+    full_rewrite = True
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = FileLock(path + ".lock")
+
+    def token(self):
+        """Changes whenever the file is rewritten (used by the herd cache)."""
+        return file_token(self.path)
+
+    def init(self):
+        if not os.path.exists(self.path):
+            with self.lock:
+                if not os.path.exists(self.path):
+                    self.save(pd.DataFrame(columns=COLUMNS))
+
+    def load(self):
+        self.init()
+        return normalize(pd.read_csv(self.path, dtype={"phash": str, "camera_id": str}))
+
+    def save(self, df):
+        with self.lock:
+            atomic_write(self.path, lambda f: df.to_csv(f, index=False))
+
+    def get(self, animal_id):
+        df = self.load()
+        rows = df[df["animal_id"] == animal_id]
+        return None if rows.empty else rows.iloc[0].to_dict()
+
+    # Load-modify-save cycles hold the writer lock end to end
+    def upsert_many(self, detections, now):
+        with self.lock:
+            self.save(merge_detections(self.load(), detections, now))
+
+    def delete(self, animal_id):
+        self.delete_many([animal_id])
+
+    def delete_many(self, animal_ids):
+        with self.lock:
+            df = self.load()
+            self.save(df[~df["animal_id"].isin(list(animal_ids))])
+
+    def rename(self, animal_id, new_name):
+        with self.lock:
+            df = self.load()
+            df.loc[df["animal_id"] == animal_id, "display_name"] = new_name
+            self.save(df)
+
+    def put_many(self, rows):
+        """Insert or fully overwrite whole rows (dicts keyed by COLUMNS)."""
+        with self.lock:
+            df = self.load().set_index("animal_id")
+            new = pd.DataFrame.from_records(rows, columns=COLUMNS).set_index("animal_id")
+            df = pd.concat([df[~df.index.isin(new.index)], new])
+            self.save(df.reset_index()[COLUMNS])
+
+
+# ===================== SQLITE BACKEND =====================
+
+SCHEMA_VERSION = 1
+
+SCHEMA = "CREATE TABLE IF NOT EXISTS animals (animal_id TEXT PRIMARY KEY, {})".format(
+    ", ".join(f"{col} {COLUMN_TYPES.get(col, 'TEXT')}" for col in COLUMNS[1:])
+)
+
+UPSERT_SQL = """
+INSERT INTO animals (animal_id, animal_type, display_name, attendance, health_status, last_seen, first_seen)
+VALUES (?, ?, ?, 1, ?, ?, ?)
+ON CONFLICT(animal_id) DO UPDATE SET
+    health_status = excluded.health_status,
+    last_seen = excluded.last_seen
+"""
+
+PUT_SQL = "INSERT INTO animals ({}) VALUES ({}) ON CONFLICT(animal_id) DO UPDATE SET {}".format(
+    ", ".join(COLUMNS),
+    ", ".join("?" * len(COLUMNS)),
+    ", ".join(f"{col} = excluded.{col}" for col in COLUMNS[1:])
+)
+
+SELECT_SQL = "SELECT {} FROM animals".format(", ".join(COLUMNS))
+
+
+class SqliteBackend:
+    """
+    Embedded SQLite herd table: primary-key index on animal_id, WAL
+    journal so readers never block the writer, and one transaction per
+    batch. Connections are per thread (Streamlit runs sessions on threads).
+    """
+
+    full_rewrite = False
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = FileLock(path + ".lock")
+        self._local = threading.local()
+
+    def token(self):
+        # Commits land in the -wal file until a checkpoint folds them back
+        return file_token(self.path), file_token(self.path + "-wal")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(SCHEMA)
+            self._add_missing_columns(conn)
+            self._local.conn = conn
+        return conn
+
+    def _add_missing_columns(self, conn):
+        # Databases created by older versions lack newer columns
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(animals)")}
+        for col in COLUMNS:
+            if col not in existing:
+                conn.execute(
+                    f"ALTER TABLE animals ADD COLUMN {col} {COLUMN_TYPES.get(col, 'TEXT')}"
+                )
+        if "first_seen" not in existing:
+            conn.execute("UPDATE animals SET first_seen = last_seen")
+
+    def _transaction(self, fn):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def init(self):
+        self._conn()
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM animals").fetchone()[0]
+
+    def load(self):
+        return pd.read_sql_query(SELECT_SQL + " ORDER BY rowid", self._conn())
+
+    def save(self, df):
+        rows = df[COLUMNS].itertuples(index=False, name=None)
+
+        def replace_all(conn):
+            conn.execute("DELETE FROM animals")
+            conn.executemany(
+                "INSERT INTO animals ({}) VALUES ({})".format(
+                    ", ".join(COLUMNS), ", ".join("?" * len(COLUMNS))
+                ),
+                rows
+            )
+
+        self._transaction(replace_all)
+
+    def get(self, animal_id):
+        cur = self._conn().execute(
+            SELECT_SQL + " WHERE animal_id = ?",
+            (animal_id,)
+        )
+        row = cur.fetchone()
+        return None if row is None else dict(zip(COLUMNS, row))
+
+    def upsert_many(self, detections, now):
+        rows = [
+            (animal_id, animal_type, animal_type, health_status, now, now)
+            for animal_id, animal_type, health_status in detections
+        ]
+        self._transaction(lambda conn: conn.executemany(UPSERT_SQL, rows))
+
+    def put_many(self, rows):
+        """Insert or fully overwrite whole rows (dicts keyed by COLUMNS)."""
+        values = [tuple(row.get(col) for col in COLUMNS) for row in rows]
+        self._transaction(lambda conn: conn.executemany(PUT_SQL, values))
+
+    def delete(self, animal_id):
+        self.delete_many([animal_id])
+
+    def delete_many(self, animal_ids):
+        values = [(animal_id,) for animal_id in animal_ids]
+        self._transaction(
+            lambda conn: conn.executemany("DELETE FROM animals WHERE animal_id = ?", values)
+        )
+
+    def rename(self, animal_id, new_name):
+        self._transaction(
+            lambda conn: conn.execute(
+                "UPDATE animals SET display_name = ? WHERE animal_id = ?",
+                (new_name, animal_id)
+            )
+        )
+
+
+# ===================== IMPORT / EXPORT =====================
+
+def import_csv(backend, csv_path):
+    """Replace the backend contents with the rows of a records CSV."""
+    backend.save(CsvBackend(csv_path).load()[COLUMNS])
+
+
+def export_csv(backend, csv_path):
+    CsvBackend(csv_path).save(backend.load()[COLUMNS])
+
+
+def migrate_csv_to_sqlite(csv_path, sqlite_path):
+    """
+    One-shot migration: copy records.csv into a fresh SQLite database.
+    The database is stamped (PRAGMA user_version) on first open, so the
+    CSV is never re-imported later, even if the herd is emptied.
+    Returns the number of migrated rows.
+    """
+    backend = SqliteBackend(sqlite_path)
+    conn = backend._conn()
+    if conn.execute("PRAGMA user_version").fetchone()[0] != 0:
+        return 0
+
+    if os.path.exists(csv_path) and not backend.count():
+        import_csv(backend, csv_path)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return backend.count()
@@ -0,0 +1,73 @@
+import hashlib
+import os
+import time
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+
+CHUNK_SIZE = 1024 * 1024   # bytes per read while spooling
+
+# A spooled upload: file path, sha256 hex digest of the content, size in bytes
+Spool = namedtuple("Spool", ["path", "sha256", "size"])
+
+
+def spool_upload(upload, root, suffix=".mp4", chunk_size=CHUNK_SIZE):
+    """
+    Copy a file-like upload to a unique file under root in fixed-size
+    chunks, hashing as it goes — memory use is one chunk, whatever the
+    upload's size. A partial file is removed if the copy fails.
+    """
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, uuid.uuid4().hex + suffix)
+    digest = hashlib.sha256()
+    size = 0
+    if hasattr(upload, "seek"):
+        upload.seek(0)
+    try:
+        with open(path, "wb") as f:
+            while True:
+                chunk = upload.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return Spool(path, digest.hexdigest(), size)
+
+
+@contextmanager
+def spooled(upload, root, suffix=".mp4"):
+    """spool_upload for one-off processing: the file is removed afterwards."""
+    spool = spool_upload(upload, root, suffix)
+    try:
+        yield spool
+    finally:
+        if os.path.exists(spool.path):
+            os.remove(spool.path)
+
+
+def sweep(root, keep=(), max_age=24 * 3600):
+    """
+    Delete spool files under root older than max_age seconds that are not
+    in `keep` (left behind by crashed requests). Returns #files removed.
+    """
+    if not os.path.isdir(root):
+        return 0
+    keep = {os.path.abspath(p) for p in keep}
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in os.listdir(root):
+        path = os.path.abspath(os.path.join(root, name))
+        if name.endswith(".json") or path in keep:
+            continue
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
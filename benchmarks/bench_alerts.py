@@ -0,0 +1,45 @@
+"""
+Vet page: open alerts from the maintained AlertIndex vs filtering the
+whole herd, as the herd grows (1% of animals flagged), plus what keeping
+the index up to date adds to one compaction batch.
+
+    python -m benchmarks.bench_alerts
+"""
+import os
+import tempfile
+import time
+
+from backend.alerts import AlertIndex
+from benchmarks.bench_dashboard import synthetic_herd
+
+REPEAT = 20
+BATCH = 500   # changed rows per compaction
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main():
+    print(f"{'animals':>8} {'alerts':>7} {'scan ms':>8} {'index ms':>9} {'observe ms/batch':>17}")
+    for n in [1_000, 10_000, 100_000]:
+        df = synthetic_herd(n)
+        df["health_status"] = "Healthy"
+        df.loc[df.index % 100 == 0, "health_status"] = "Needs Vet Support"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            alerts = AlertIndex(os.path.join(tmp, "alerts.json"))
+            alerts.rebuild(df.to_dict("records"))
+
+            scan = timed(lambda: df[df["health_status"] != "Healthy"].to_dict("records"))
+            index = timed(alerts.open_alerts)
+            batch = df.sample(BATCH, random_state=0).to_dict("records")
+            observe = timed(lambda: alerts.observe(batch))
+            print(f"{n:>8} {len(alerts.open_alerts()):>7} {scan:>8.2f} {index:>9.2f} {observe:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Sighting archive: write a synthetic year of camera sightings, then time
+the dashboard queries (attendance per day, health trend) against it.
+
+Then the write pattern the compactor really produces — one small part
+every few seconds — with and without merging parts, and the same
+queries over those days.
+
+    python -m benchmarks.bench_archive [rows_per_day]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from backend import archive as archive_module
+from backend.archive import SightingArchive
+
+DAYS = 365
+HERD = 2000
+
+PART_DAYS = 5
+PARTS_PER_DAY = 2000   # one camera, compacted every ~40 s (every 5 s would be 17k)
+ROWS_PER_PART = 30
+
+
+def synthetic_day(rng, day_index, rows):
+    start = (date(2025, 1, 1) + timedelta(days=day_index)).toordinal()
+    ts0 = (start - date(1970, 1, 1).toordinal()) * 86400
+    return {
+        "ts": ts0 + np.sort(rng.integers(0, 86400, rows)),
+        "animal": rng.integers(0, HERD, rows),
+        "type": rng.integers(0, 4, rows),
+        "conf": rng.random(rows),
+        "health": rng.random(rows) < 0.1,
+        "source": np.full(rows, 3)
+    }
+
+
+def main():
+    rows_per_day = int(sys.argv[1]) if len(sys.argv) > 1 else 60_000
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = SightingArchive(os.path.join(tmp, "archive"))
+        with archive.lock:
+            archive.animals.encode([f"COW_{i:08x}" for i in range(HERD)])
+
+        start = time.perf_counter()
+        for d in range(DAYS):
+            day = (date(2025, 1, 1) + timedelta(days=d)).isoformat()
+            archive.append_columns(day, synthetic_day(rng, d, rows_per_day))
+        write_s = time.perf_counter() - start
+
+        total = DAYS * rows_per_day
+        size_mb = sum(
+            os.path.getsize(os.path.join(root, f))
+            for root, _, files in os.walk(archive.root) for f in files
+        ) / 1e6
+        print(f"wrote {total:,} sightings in {write_s:.1f}s, {size_mb:.0f} MB "
+              f"({size_mb * 1e6 / total:.1f} bytes/row)")
+
+        for label, query in [
+            ("attendance/day, 30 days", lambda: archive.attendance_per_day("2025-12-02")),
+            ("attendance/day, full year", lambda: archive.attendance_per_day()),
+            ("health trend, full year", lambda: archive.health_trend()),
+            ("health trend, one animal, year", lambda: archive.health_trend(animal_id="COW_00000007")),
+        ]:
+            start = time.perf_counter()
+            result = query()
+            print(f"{label:<32} {(time.perf_counter() - start) * 1000:8.1f} ms ({len(result)} days)")
+
+
+
+def compaction_pattern(tmp, merge):
+    rng = np.random.default_rng(1)
+    archive = SightingArchive(os.path.join(tmp, f"archive-{'merged' if merge else 'loose'}"))
+    archive_module.MERGE_EVERY = 64 if merge else 10**9
+
+    start = time.perf_counter()
+    for d in range(PART_DAYS):
+        day = (date(2025, 1, 1) + timedelta(days=d)).isoformat()
+        for _ in range(PARTS_PER_DAY):
+            archive.append_columns(day, synthetic_day(rng, d, ROWS_PER_PART))
+        if merge:
+            archive.merge(day)   # what merge_closed() does once the day is over
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    archive.attendance_per_day()
+    archive.health_trend()
+    query_ms = (time.perf_counter() - start) * 1000
+    print(f"{'merged' if merge else 'loose':<8} {PART_DAYS * PARTS_PER_DAY:>7} parts written in "
+          f"{write_s:5.1f}s ({write_s / (PART_DAYS * PARTS_PER_DAY) * 1000:.2f} ms/part), "
+          f"{PART_DAYS}-day queries {query_ms:8.1f} ms")
+
+
+def main_compaction():
+    print(f"\ncompaction-sized parts: {PARTS_PER_DAY}/day x {ROWS_PER_PART} rows, {PART_DAYS} days")
+    with tempfile.TemporaryDirectory() as tmp:
+        for merge in [False, True]:
+            compaction_pattern(tmp, merge)
+
+
+if __name__ == "__main__":
+    main()
+    main_compaction()
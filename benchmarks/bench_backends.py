@@ -0,0 +1,98 @@
+"""
+Inference backends side by side: load time, single-frame latency, batched
+throughput and peak memory (RSS) for torch / onnx / onnx-int8.
+
+    python -m vision.export --int8 some_clip.mp4   # once, for the ONNX files
+    python -m benchmarks.bench_backends
+
+Every backend runs in its own process so import cost and peak RSS are
+not mixed up between them. Backends whose runtime or model file is
+missing are listed as unavailable.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.common import make_video
+from vision.inference import MODEL_FILES
+
+FRAMES = 32
+BATCH = 8
+
+
+def sample_frames(path, n=FRAMES):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < n:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def child(backend, video):
+    t0 = time.perf_counter()
+    from vision.inference import load_detector
+    model = load_detector(backend)
+    load_s = time.perf_counter() - t0
+
+    frames = sample_frames(video)
+    model(frames[:1])   # warm-up
+
+    latencies = []
+    for frame in frames:
+        t0 = time.perf_counter()
+        model([frame])
+        latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    for i in range(0, len(frames), BATCH):
+        model(frames[i:i + BATCH])
+    throughput = len(frames) / (time.perf_counter() - t0)
+
+    return {
+        "load_s": load_s,
+        "p50_ms": float(np.median(latencies)) * 1000,
+        "fps": throughput,
+        # ru_maxrss is KiB on Linux
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+
+def main():
+    if "--child" in sys.argv:
+        backend, video = sys.argv[2], sys.argv[3]
+        try:
+            print(json.dumps(child(backend, video)))
+        except (ImportError, FileNotFoundError) as exc:
+            print(json.dumps({"error": str(exc)}))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = make_video(os.path.join(tmp, "farm.mp4"), seconds=2, size=(1280, 720))
+        print(f"{'backend':<10} {'load s':>7} {'p50 ms':>7} {f'fps@{BATCH}':>7} {'RSS MB':>7}")
+        for backend in MODEL_FILES:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_backends", "--child", backend, video],
+                capture_output=True, text=True
+            )
+            lines = out.stdout.strip().splitlines()
+            result = json.loads(lines[-1]) if lines else {"error": out.stderr.strip()[-200:]}
+            if "error" in result:
+                print(f"{backend:<10} unavailable: {result['error']}")
+                continue
+            print(f"{backend:<10} {result['load_s']:>7.2f} {result['p50_ms']:>7.1f} "
+                  f"{result['fps']:>7.1f} {result['rss_mb']:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
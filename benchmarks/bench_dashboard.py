@@ -0,0 +1,62 @@
+"""
+Dashboard data layer: build the indexed HerdView once per herd version,
+then time page queries (filter + sort + one page) as the herd grows.
+A page should cost about the same at 1k and 100k animals.
+
+    python -m benchmarks.bench_dashboard
+"""
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from backend.herd_view import HerdView
+from backend.storage import COLUMNS
+
+TYPES = ["Cow", "Buffalo", "Goat", "Sheep", "Horse"]
+REPEAT = 50
+
+
+def synthetic_herd(n, seed=0):
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    df = pd.DataFrame({
+        "animal_id": [f"COW_{i:08x}" for i in range(n)],
+        "animal_type": rng.choice(TYPES, n),
+        "display_name": [f"Animal {i}" for i in range(n)],
+        "attendance": rng.integers(1, 500, n),
+        "health_status": np.where(rng.random(n) < 0.1, "Needs Vet Support", "Healthy"),
+        "last_seen": [
+            (now - timedelta(minutes=int(m))).strftime("%Y-%m-%d %H:%M:%S")
+            for m in rng.integers(0, 60 * 24 * 30, n)
+        ]
+    })
+    return df.reindex(columns=COLUMNS)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main():
+    print(f"{'animals':>8} {'build ms':>9} {'page ms':>8} {'filtered ms':>12} {'sorted ms':>10}")
+    for n in [1_000, 10_000, 100_000]:
+        df = synthetic_herd(n)
+        start = time.perf_counter()
+        view = HerdView(df, version=1)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        view.page()  # first request for a sort order computes it
+        plain = timed(lambda: view.page(page=3))
+        filtered = timed(lambda: view.page(types=["Cow", "Goat"], health=["Needs Vet Support"]))
+        view.page(sort="display_name", descending=False)
+        by_name = timed(lambda: view.page(sort="display_name", descending=False, page=10))
+        print(f"{n:>8} {build_ms:>9.1f} {plain:>8.2f} {filtered:>12.2f} {by_name:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
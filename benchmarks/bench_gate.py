@@ -0,0 +1,39 @@
+"""
+Motion-gated inference: how many detector calls the MotionGate saves on
+clips that are still for part of the time, and what that does to speed.
+
+    python -m benchmarks.bench_gate [--real]
+
+"active" is the fraction of the clip in which the animals move.
+"""
+import os
+import sys
+import tempfile
+
+from benchmarks.common import load_detector, make_video
+from vision.motion import MotionGate
+from vision.sampling import StrideSampler
+from vision.video import VideoEngine
+
+STRIDE = 3
+
+
+def main():
+    model = load_detector(real="--real" in sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'active':>6} {'gate':>5} {'skipped':>8} {'video fps':>10} {'boxes':>7}")
+        for active in [1.0, 0.5, 0.1]:
+            path = make_video(
+                os.path.join(tmp, f"pen_{active}.mp4"), seconds=30, size=(1280, 720), active=active
+            )
+            for gate in [None, MotionGate()]:
+                boxes = []
+                stats = VideoEngine(model, sampler=StrideSampler(STRIDE), gate=gate).run(
+                    path, lambda i, f, dets: boxes.extend(len(d) for d in dets)
+                )
+                print(f"{active:>6.1f} {'on' if gate else 'off':>5} "
+                      f"{stats['skip_fraction']:>8.0%} {stats['fps']:>10.1f} {sum(boxes):>7}")
+
+
+if __name__ == "__main__":
+    main()
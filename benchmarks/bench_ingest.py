@@ -0,0 +1,81 @@
+"""
+Per-frame ingest latency against herd size.
+
+Compares the old path (one upsert_animal call per detected box) with the
+batched upsert_many path and the sighting-log path on throwaway CSV and
+SQLite stores.
+
+    python -m benchmarks.bench_ingest
+"""
+import tempfile
+import time
+
+import pandas as pd
+
+from backend import database
+from benchmarks.common import use_store
+
+HERD_SIZES = [10, 100, 1000, 10000]
+BOXES_PER_FRAME = 30
+FRAMES = 5
+
+
+def seed_herd(n):
+    df = pd.DataFrame({
+        "animal_id": [f"COW_{i:08x}" for i in range(n)],
+        "animal_type": "Cow",
+        "display_name": "Cow",
+        "attendance": 1,
+        "health_status": "Healthy",
+        "last_seen": "2026-01-01 00:00:00"
+    })
+    database.save_db(df)
+
+
+def frame_detections(n, frame):
+    # Half re-sightings of known animals, half brand-new animals
+    return [
+        (f"COW_{(frame * BOXES_PER_FRAME + i) % max(1, n):08x}" if i % 2 else f"NEW_{frame:04d}{i:04d}",
+         "Cow", "Healthy")
+        for i in range(BOXES_PER_FRAME)
+    ]
+
+
+def time_frames(n, ingest):
+    seed_herd(n)
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        ingest(frame_detections(n, frame))
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def per_box(detections):
+    for det in detections:
+        database.upsert_animal(*det)
+
+
+def logged(detections):
+    database.record_sightings(
+        {"animal_id": a, "animal_type": t, "confidence": 0.9, "health_status": h,
+         "source": "video", "bbox": (0, 0, 10, 10)}
+        for a, t, h in detections
+    )
+
+
+def main():
+    for backend in ["csv", "sqlite"]:
+        with tempfile.TemporaryDirectory() as tmp:
+            use_store(tmp, backend)
+
+            print(f"[{backend}] {BOXES_PER_FRAME} boxes/frame, ms per frame")
+            print(f"{'herd':>8} {'per-box':>10} {'batched':>10} {'log':>10}")
+            for n in HERD_SIZES:
+                slow = time_frames(n, per_box)
+                fast = time_frames(n, database.upsert_many)
+                log = time_frames(n, logged)
+                print(f"{n:>8} {slow:>10.2f} {fast:>10.2f} {log:>10.2f}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
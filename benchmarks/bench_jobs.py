@@ -0,0 +1,49 @@
+"""
+Background video jobs: total throughput as the worker pool grows.
+
+    python -m benchmarks.bench_jobs
+
+Runs in a scratch directory (own records store and jobs/ spool) with the
+stub model, so only decoding, tracking, motion and persistence cost CPU.
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.common import StubModel, make_video
+from vision.jobs import ACTIVE, JobQueue
+
+VIDEOS = 4
+
+
+def run(workers, paths):
+    queue = JobQueue(root=f"jobs-{workers}", workers=workers, model_factory=StubModel)
+    start = time.perf_counter()
+    ids = []
+    for path in paths:
+        with open(path, "rb") as f:
+            ids.append(queue.submit_video(f, os.path.basename(path))["id"])
+    while any(queue.status(i)["status"] in ACTIVE for i in ids):
+        time.sleep(0.2)
+    elapsed = time.perf_counter() - start
+    queue.shutdown()
+    frames = sum(queue.status(i)["stats"]["decoded_frames"] for i in ids)
+    return frames / elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        paths = [
+            make_video(f"clip{i}.mp4", seconds=60, size=(1280, 720), seed=i) for i in range(VIDEOS)
+        ]
+        print(f"{'workers':>7} {'video fps':>10} {'speedup':>8}")
+        base = None
+        for workers in [1, 2, 4]:
+            fps = run(workers, paths)
+            base = base or fps
+            print(f"{workers:>7} {fps:>10.1f} {fps / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Live camera responsiveness: the original read → infer → store → draw loop
+vs the threaded StreamManager (one camera, sampled at the camera's rate),
+on a looping video file standing in for a 30 fps camera.
+
+    python -m benchmarks.bench_live [--real]
+
+Reports how often the screen gets a new frame, how old the shown frame
+is, and how many camera frames were dropped to stay current.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from backend.storage import COLUMNS
+from benchmarks.common import load_detector, make_video
+from vision.detection import parse_results
+from vision.live import FileCamera, annotate
+from vision.reid import ReIdIndex
+from vision.streams import StreamManager
+from vision.tracker import TrackingStage
+
+SECONDS = 10
+CAMERA_FPS = 30.0
+
+
+def slow_sink(sightings):
+    # A database write on the hot path, as record_sightings used to be
+    time.sleep(0.02)
+
+
+def sequential(model, path):
+    """The in-thread loop app.py used: every step blocks the next frame."""
+    camera = FileCamera(path)
+    stage = TrackingStage(ReIdIndex.from_herd(pd.DataFrame(columns=COLUMNS)), "camera")
+    shown = 0
+    ages = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < SECONDS:
+        ok, frame = camera.read()
+        t0 = time.monotonic()
+        matched, sightings = stage.process(frame, parse_results(model(frame)[0]))
+        slow_sink(sightings)
+        annotate(frame, matched)
+        shown += 1
+        ages.append((time.monotonic() - t0) * 1000)
+    camera.release()
+    return shown / SECONDS, sum(ages) / len(ages), 0
+
+
+def threaded(model, path):
+    manager = StreamManager(
+        model, ReIdIndex.from_herd(pd.DataFrame(columns=COLUMNS)), slow_sink, fps=CAMERA_FPS
+    )
+    manager.add("cam1", FileCamera(path))
+    manager.start()
+    shown = 0
+    ages = []
+    last = None
+    start = time.perf_counter()
+    while time.perf_counter() - start < SECONDS:
+        frame = manager.latest("cam1")
+        if frame is not None and frame is not last:
+            shown += 1
+            ages.append(manager.stats()["cameras"]["cam1"]["latency_ms"])
+            last = frame
+        time.sleep(1 / 60)
+    dropped = manager.stats()["cameras"]["cam1"]["dropped"]
+    manager.stop()
+    return shown / SECONDS, sum(ages) / max(len(ages), 1), dropped
+
+
+def main():
+    model = load_detector(real="--real" in sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_video(os.path.join(tmp, "camera.mp4"), seconds=5, size=(1280, 720))
+
+        print(f"{'mode':<12} {'shown fps':>10} {'latency ms':>11} {'dropped':>8}")
+        for name, run in [("sequential", sequential), ("threaded", threaded)]:
+            fps, latency, dropped = run(model, path)
+            print(f"{name:<12} {fps:>10.1f} {latency:>11.0f} {dropped:>8}")
+
+
+if __name__ == "__main__":
+    main()
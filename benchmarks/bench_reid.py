@@ -0,0 +1,57 @@
+"""
+Re-identification cost: hashing a crop (old MD5-of-JPEG vs perceptual
+hash) and nearest-animal lookup time against herd size.
+
+    python -m benchmarks.bench_reid
+"""
+import hashlib
+import time
+
+import cv2
+import numpy as np
+
+from vision.reid import ReIdIndex, phash
+
+HERD_SIZES = [100, 1000, 10000, 100000]
+LOOKUPS = 2000
+
+
+def per_call_us(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def md5_of_jpeg(crop):
+    _, buf = cv2.imencode(".jpg", crop)
+    return hashlib.md5(buf).hexdigest()[:8]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    crop = rng.integers(0, 255, (220, 320, 3), dtype=np.uint8)
+
+    print("hash per 320x220 crop")
+    print(f"  md5 of jpeg  {per_call_us(lambda: md5_of_jpeg(crop), 500):8.1f} us")
+    print(f"  phash        {per_call_us(lambda: phash(crop), 500):8.1f} us")
+
+    # Same crop, slightly shifted + brighter → should keep its id
+    moved = cv2.convertScaleAbs(np.roll(crop, 2, axis=1), alpha=1.0, beta=12)
+    index = ReIdIndex()
+    first, _ = index.identify(crop, "Cow")
+    again, _ = index.identify(moved, "Cow")
+    print(f"shifted/brighter crop re-identified: {first == again}")
+
+    print("nearest-animal lookup")
+    for n in HERD_SIZES:
+        index = ReIdIndex()
+        for i, h in enumerate(rng.integers(0, 2**63, n, dtype=np.uint64)):
+            index.add(int(h), "Cow", f"COW_{i}")
+        probes = [int(h) for h in rng.integers(0, 2**63, LOOKUPS, dtype=np.uint64)]
+        it = iter(probes)
+        print(f"  herd {n:>7}  {per_call_us(lambda: index.lookup(next(it), 'Cow'), LOOKUPS):8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
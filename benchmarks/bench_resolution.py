@@ -0,0 +1,50 @@
+"""
+Detection latency per input size, with the default livestock allowlist.
+
+    python -m benchmarks.bench_resolution [--real]
+
+With --real the configured backend (FARM_INFERENCE_BACKEND) runs on a
+synthetic barn frame; the stub's cost just scales with the input area.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.common import load_detector, make_video
+from vision.config import DetectionConfig, INPUT_SIZES
+from vision.detection import parse_results
+
+RUNS = 20
+
+
+def latency(model, frame, options):
+    model(frame, **options)   # warm-up
+    times = []
+    boxes = 0
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        boxes = len(parse_results(model(frame, **options)[0]))
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times)) * 1000, boxes
+
+
+def main():
+    model = load_detector(real="--real" in sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        cap = cv2.VideoCapture(make_video(os.path.join(tmp, "barn.mp4"), seconds=1, size=(1920, 1080)))
+        _, frame = cap.read()
+        cap.release()
+
+    print(f"{'imgsz':>6} {'p50 ms':>8} {'boxes':>6}")
+    for imgsz in INPUT_SIZES:
+        options = DetectionConfig(imgsz={"image": imgsz}).options(model.names, "image")
+        ms, boxes = latency(model, frame, options)
+        print(f"{imgsz:>6} {ms:>8.1f} {boxes:>6}")
+
+
+if __name__ == "__main__":
+    main()
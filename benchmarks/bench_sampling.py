@@ -0,0 +1,61 @@
+"""
+Decode cost of frame sampling strategies on a long synthetic farm video,
+against the original read-every-frame-and-discard loop.
+
+    python -m benchmarks.bench_sampling [minutes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+from benchmarks.common import make_video
+from vision.sampling import AdaptiveSampler, SeekSampler, StrideSampler, TimeSampler
+
+
+def read_and_discard(cap, stride=15):
+    """The original loop: cap.read() every frame, keep every stride-th."""
+    index = 0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            return
+        if (index + 1) % stride == 0:
+            yield index, frame
+        index += 1
+
+
+def run(path, frames):
+    cap = cv2.VideoCapture(path)
+    start = time.perf_counter()
+    kept = sum(1 for _ in frames(cap))
+    elapsed = time.perf_counter() - start
+    cap.release()
+    return kept, elapsed
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_video(os.path.join(tmp, "farm.mp4"), seconds=minutes * 60, size=(1280, 720))
+
+        strategies = [
+            ("read + discard /15", read_and_discard),
+            ("stride grab /15", StrideSampler(15).frames),
+            ("seek /15", SeekSampler(15).frames),
+            ("seek /150", SeekSampler(150).frames),
+            ("time 2 fps", TimeSampler(2).frames),
+            ("adaptive 30/5", AdaptiveSampler().frames),
+        ]
+        _, baseline = run(path, read_and_discard)
+        print(f"{minutes:g} min 720p @30fps")
+        print(f"{'strategy':<20} {'kept':>6} {'seconds':>8} {'vs baseline':>12}")
+        for label, frames in strategies:
+            kept, elapsed = run(path, frames)
+            print(f"{label:<20} {kept:>6} {elapsed:>8.2f} {baseline / elapsed:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
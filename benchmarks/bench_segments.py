@@ -0,0 +1,38 @@
+"""
+Segment-parallel processing of one long video: speedup per worker count,
+and whether the merged result matches the single-process run.
+
+    python -m benchmarks.bench_segments
+
+Uses the stub model (one instance per worker process). Speedup is
+bounded by the cores of this machine.
+"""
+import os
+import tempfile
+
+from benchmarks.common import StubModel, make_video
+from vision.segments import process_video_parallel
+
+
+def summary(result):
+    return sorted(result["behaviors"]), [(s["animal_id"], s["bbox"]) for s in result["sightings"]]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_video(os.path.join(tmp, "night.mp4"), seconds=120, size=(1280, 720))
+        print(f"{'workers':>7} {'segments':>8} {'video fps':>10} {'speedup':>8} "
+              f"{'animals':>8} {'stitched':>8} {'same ids':>9} {'repeatable':>10}")
+        base = single = None
+        for workers in [1, 2, 4, 8]:
+            result = process_video_parallel(path, workers, StubModel)
+            again = process_video_parallel(path, workers, StubModel)
+            base = base or result["fps"]
+            single = single or summary(result)[0]
+            print(f"{workers:>7} {result['segments']:>8} {result['fps']:>10.1f} "
+                  f"{result['fps'] / base:>7.2f}x {result['animals']:>8} {result['stitched']:>8} "
+                  f"{str(summary(result)[0] == single):>9} {str(summary(result) == summary(again)):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Cold start: what each page pays before it paints.
+
+    python -m benchmarks.bench_startup [--real]
+
+1. Import time of the app's startup modules and of each page's lazy
+   imports, every group in a fresh interpreter (nothing cached).
+2. First render of every page through streamlit's AppTest, again one
+   fresh interpreter per page, in a scratch directory — plus which heavy
+   modules (cv2, torch, ultralytics, onnxruntime) that page pulled in.
+   Skipped when streamlit is not installed.
+
+With --real the model load itself is timed too (needs the weights).
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_GROUPS = {
+    "startup": ["backend.database", "vision.config", "vision.jobs", "backend.uploads", "backend.herd_view"],
+    "Detection": ["cv2", "vision.detection", "vision.reid", "vision.inference"],
+    "Video": ["vision.motion", "vision.sampling"],
+    "Live Camera": ["vision.streams", "vision.inference", "vision.reid"],
+}
+
+PAGES = ["Detection", "Video", "Dashboard", "Vet", "Settings", "Live Camera"]
+HEAVY = ["cv2", "torch", "ultralytics", "onnxruntime"]
+
+IMPORT_SCRIPT = """
+import importlib, json, sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+print(json.dumps(time.perf_counter() - start))
+"""
+
+RENDER_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.session_state["page"] = sys.argv[2]
+at.run()
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "heavy": [m for m in %r if m in sys.modules],
+    "errors": len(at.exception)
+}))
+""" % HEAVY
+
+MODEL_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from vision.inference import shared_detector
+shared_detector()
+print(json.dumps(time.perf_counter() - start))
+"""
+
+
+def fresh(script, *args, cwd=ROOT):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.run(
+        [sys.executable, "-c", script, *args], cwd=cwd, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    print(f"{'imports':<14} {'cold s':>7}")
+    for group, modules in IMPORT_GROUPS.items():
+        print(f"{group:<14} {fresh(IMPORT_SCRIPT, *modules):>7.2f}")
+
+    if "--real" in sys.argv:
+        print(f"{'model load':<14} {fresh(MODEL_SCRIPT):>7.2f}")
+
+    try:
+        import streamlit  # noqa: F401
+    except ImportError:
+        print("\nstreamlit not installed: skipping first-render timings")
+        return
+
+    print(f"\n{'first render':<14} {'s':>7}  heavy modules")
+    with tempfile.TemporaryDirectory() as tmp:
+        for page in PAGES:
+            result = fresh(RENDER_SCRIPT, os.path.join(ROOT, "app.py"), page, cwd=tmp)
+            note = " (page raised)" if result["errors"] else ""
+            print(f"{page:<14} {result['seconds']:>7.2f}  {', '.join(result['heavy']) or '-'}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Multi-camera barn: N looping video files as fake cameras sharing one
+(stub) model through StreamManager.
+
+    python -m benchmarks.bench_streams [--real]
+
+For each barn size prints the batches the scheduler ran, the sampling
+rate every camera actually got, and the load factor the manager settled
+on once the requested rate no longer fit.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from backend.storage import COLUMNS
+from benchmarks.common import load_detector, make_video
+from vision.live import FileCamera
+from vision.reid import ReIdIndex
+from vision.streams import StreamManager
+
+SECONDS = 8
+FPS = 5.0
+
+
+def run(model, paths):
+    sightings = []
+    manager = StreamManager(
+        model, ReIdIndex.from_herd(pd.DataFrame(columns=COLUMNS)), sightings.extend, fps=FPS
+    )
+    for i, path in enumerate(paths):
+        manager.add(f"cam{i + 1}", FileCamera(path))
+    manager.start()
+    time.sleep(SECONDS)
+    stats = manager.stats()
+    manager.stop()
+
+    rates = [c["inferred"] / SECONDS for c in stats["cameras"].values()]
+    cameras = {s.get("camera_id") for s in sightings}
+    return stats, min(rates), max(rates), len(cameras)
+
+
+def main():
+    model = load_detector(real="--real" in sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [
+            make_video(os.path.join(tmp, f"cam{i}.mp4"), seconds=4, size=(640, 360), seed=i)
+            for i in range(8)
+        ]
+        print(f"{'cameras':>7} {'batches':>8} {'min fps':>8} {'max fps':>8} "
+              f"{'load':>6} {'ms/frame':>9} {'ids from':>9}")
+        for n in [1, 2, 4, 8]:
+            stats, lo, hi, seen = run(model, paths[:n])
+            print(f"{n:>7} {stats['batches']:>8} {lo:>8.2f} {hi:>8.2f} "
+                  f"{stats['load_factor']:>6.2f} {stats['frame_cost_ms']:>9.1f} {seen:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Video processing throughput: the original decode-then-infer loop vs the
+threaded, batched VideoEngine.
+
+    python -m benchmarks.bench_video [--real]
+
+--real uses ./yolov8n.pt through ultralytics; the default stub model
+keeps the benchmark offline and GPU-free.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+from benchmarks.common import load_detector, make_video
+from vision.detection import parse_results
+from vision.sampling import StrideSampler
+from vision.video import VideoEngine
+
+STRIDE = 15
+
+
+def sequential(model, path):
+    """The loop app.py used: read every frame, infer every STRIDE-th alone."""
+    cap = cv2.VideoCapture(path)
+    start = time.perf_counter()
+    decoded = 0
+    while cap.isOpened():
+        ok, frame = cap.read()
+        if not ok:
+            break
+        decoded += 1
+        if decoded % STRIDE != 0:
+            continue
+        parse_results(model(frame)[0])
+    cap.release()
+    return decoded / (time.perf_counter() - start)
+
+
+def main():
+    model = load_detector(real="--real" in sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_video(os.path.join(tmp, "farm.mp4"), seconds=60, size=(1280, 720))
+
+        print(f"{'mode':<22} {'video fps':>10}")
+        print(f"{'sequential':<22} {sequential(model, path):>10.1f}")
+        for batch in [1, 4, 8, 16]:
+            stats = VideoEngine(model, batch_size=batch, sampler=StrideSampler(STRIDE)).run(
+                path, lambda *args: None
+            )
+            print(f"{f'engine batch={batch}':<22} {stats['fps']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
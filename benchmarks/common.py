@@ -0,0 +1,111 @@
+"""Shared helpers for the benchmarks: synthetic videos, a stub detector, scratch stores."""
+import os
+import time
+
+import cv2
+import numpy as np
+
+COCO_NAMES = {14: "bird", 16: "dog", 17: "horse", 18: "sheep", 19: "cow"}
+
+
+def use_store(root, backend=None):
+    """
+    Point backend.database at a store under root — every file it writes
+    (herd, sighting log, archive, alerts), so nothing lands in the repo.
+    """
+    from backend import database
+
+    if backend is not None:
+        database.DB_BACKEND = backend
+    database.DB_FILE = os.path.join(root, "records.csv")
+    database.SQLITE_FILE = os.path.join(root, "records.db")
+    database.SIGHTINGS_FILE = os.path.join(root, "sightings.log")
+    database.ARCHIVE_DIR = os.path.join(root, "archive")
+    database.ALERTS_FILE = os.path.join(root, "alerts.json")
+
+
+def make_video(path, seconds=20, fps=30, size=(640, 360), animals=3, seed=0, active=1.0):
+    """
+    Write a synthetic farm clip: textured background with a few moving
+    "animals" (filled ellipses). With active < 1 the animals only move for
+    that fraction of every 10 seconds and stand still otherwise (a quiet
+    pen at night). Returns the path.
+    """
+    rng = np.random.default_rng(seed)
+    w, h = size
+    background = cv2.GaussianBlur(rng.integers(60, 140, (h, w, 3), dtype=np.uint8), (0, 0), 3)
+    starts = rng.uniform([0, 0], [w * 0.7, h * 0.7], (animals, 2))
+    speeds = rng.uniform(-2, 2, (animals, 2))
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    window = 10 * fps
+    moved = 0
+    for i in range(int(seconds * fps)):
+        if i % window < active * window:
+            moved += 1
+        frame = background.copy()
+        for (x, y), (dx, dy) in zip(starts, speeds):
+            cx = int(x + dx * moved) % w
+            cy = int(y + dy * moved) % h
+            cv2.ellipse(frame, (cx, cy), (40, 25), 0, 0, 360, (230, 230, 230), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+class StubBoxes:
+    def __init__(self, xyxy, cls, conf):
+        self.xyxy = xyxy
+        self.cls = cls
+        self.conf = conf
+
+    def __len__(self):
+        return len(self.xyxy)
+
+
+class StubResult:
+    names = COCO_NAMES
+
+    def __init__(self, frame, boxes_per_frame, classes=None):
+        h, w = frame.shape[:2]
+        n = boxes_per_frame if classes is None or 19 in classes else 0
+        x1 = np.linspace(0, w * 0.8, n)
+        self.boxes = StubBoxes(
+            np.stack([x1, np.full(n, h * 0.2), x1 + w * 0.15, np.full(n, h * 0.6)], axis=1),
+            np.full(n, 19),
+            np.full(n, 0.8)
+        )
+
+
+class StubModel:
+    """
+    Offline stand-in for the YOLO model: sleeps for a fixed per-call
+    overhead plus a per-frame cost (like a real CPU forward pass, the sleep
+    releases the GIL) and returns fixed "cow" boxes. The per-frame cost
+    scales with the input area when imgsz is passed (640 = frame_ms).
+    """
+
+    names = COCO_NAMES
+
+    def __init__(self, call_ms=15.0, frame_ms=25.0, boxes_per_frame=3):
+        self.call_ms = call_ms
+        self.frame_ms = frame_ms
+        self.boxes_per_frame = boxes_per_frame
+
+    def __call__(self, frames, imgsz=640, classes=None, **kwargs):
+        if not isinstance(frames, list):
+            frames = [frames]
+        frame_ms = self.frame_ms * (imgsz / 640) ** 2
+        time.sleep((self.call_ms + frame_ms * len(frames)) / 1000)
+        return [StubResult(f, self.boxes_per_frame, classes) for f in frames]
+
+
+def load_detector(real=False):
+    """
+    The real model if asked for (and installed) — through the backend named
+    by FARM_INFERENCE_BACKEND, see vision.inference — else the stub.
+    """
+    if real:
+        from vision.inference import load_detector as load_backend
+        return load_backend()
+    return StubModel()
@@ -0,0 +1,74 @@
+"""
+Multi-process stress test for the record store.
+
+Several processes hammer the same store with inserts, renames and deletes
+at once; afterwards every write must be visible (no lost updates) and the
+file must still parse (no torn writes). Exits non-zero on failure.
+
+    python -m benchmarks.stress_store
+"""
+import multiprocessing as mp
+import sys
+import tempfile
+
+from backend import database
+from benchmarks.common import use_store
+
+WORKERS = 6
+ROUNDS = 40
+
+
+def worker(backend, tmp, worker_id):
+    use_store(tmp, backend)
+    for i in range(ROUNDS):
+        animal_id = f"W{worker_id}_{i}"
+        database.upsert_animal(animal_id, "Cow", "Healthy")
+        database.update_display_name(animal_id, f"Cow {worker_id}-{i}")
+        # Every third animal is created and removed again
+        if i % 3 == 0:
+            database.upsert_animal(animal_id + "_tmp", "Goat", "Healthy")
+            database.delete_animal(animal_id + "_tmp")
+
+
+def check(backend):
+    with tempfile.TemporaryDirectory() as tmp:
+        use_store(tmp, backend)
+        database.init_db()
+
+        procs = [
+            mp.Process(target=worker, args=(backend, tmp, w)) for w in range(WORKERS)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+        database._backends.clear()
+        database._caches.clear()
+        df = database.load_db().set_index("animal_id")
+
+        expected = {f"W{w}_{i}" for w in range(WORKERS) for i in range(ROUNDS)}
+        missing = expected - set(df.index)
+        leftovers = [a for a in df.index if a.endswith("_tmp")]
+        wrong_names = [
+            a for a in expected - missing
+            if df.at[a, "display_name"] != "Cow {}-{}".format(*a[1:].split("_"))
+        ]
+
+        ok = not (missing or leftovers or wrong_names)
+        print(
+            f"[{backend}] {WORKERS} procs x {ROUNDS} rounds: "
+            f"{len(df)} rows, missing={len(missing)}, "
+            f"undeleted={len(leftovers)}, lost_renames={len(wrong_names)} "
+            f"-> {'OK' if ok else 'FAIL'}"
+        )
+        return ok
+
+
+def main():
+    results = [check(backend) for backend in ["csv", "sqlite"]]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Memory-bound check for the upload → spool → video processing path.
+
+1. A large upload is spooled to disk in chunks (with its SHA-256) and
+   the peak RSS growth is compared with reading it whole, as the old
+   handlers did.
+2. A long synthetic video is processed by the VideoEngine with tracking
+   and per-animal motion; RSS is sampled throughout and must stay flat
+   (the second half may not grow past the first).
+
+Exits non-zero if either bound is exceeded.
+
+    python -m benchmarks.stress_upload
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from backend.storage import COLUMNS
+from backend.uploads import spool_upload
+from benchmarks.common import StubModel, make_video
+from vision.motion import RoiMotion
+from vision.reid import ReIdIndex
+from vision.sampling import StrideSampler
+from vision.tracker import TrackingStage
+from vision.video import VideoEngine
+
+UPLOAD_MB = 1024
+COMPARE_MB = 256            # the whole-read comparison allocates this much
+MAX_SPOOL_GROWTH_MB = 32
+MAX_DRIFT_MB = 16
+VIDEO_SECONDS = 300
+
+PAGE = os.sysconf("SC_PAGE_SIZE")
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE / 2**20
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.samples.append(rss_mb())
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+
+def sparse_file(path, mb):
+    with open(path, "wb") as f:
+        f.truncate(mb * 2**20)
+    return path
+
+
+def peak_growth(fn):
+    base = rss_mb()
+    sampler = RssSampler()
+    sampler.start()
+    result = fn()
+    return result, max(sampler.stop() + [rss_mb()]) - base
+
+
+def whole_read(src, dst):
+    with open(src, "rb") as upload, open(dst, "wb") as f:
+        data = upload.read()
+        f.write(data)
+        return hashlib.sha256(data).hexdigest()
+
+
+def main():
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        small = sparse_file(os.path.join(tmp, "small.bin"), COMPARE_MB)
+        _, grown = peak_growth(lambda: whole_read(small, os.path.join(tmp, "copy.bin")))
+        print(f"whole read  {COMPARE_MB:>5} MB upload: +{grown:6.1f} MB RSS")
+        with open(small, "rb") as upload:
+            _, grown = peak_growth(lambda: spool_upload(upload, tmp, ".bin"))
+        print(f"chunked     {COMPARE_MB:>5} MB upload: +{grown:6.1f} MB RSS")
+
+        big = sparse_file(os.path.join(tmp, "big.bin"), UPLOAD_MB)
+        t0 = time.perf_counter()
+        with open(big, "rb") as upload:
+            spool, grown = peak_growth(lambda: spool_upload(upload, tmp, ".bin"))
+        rate = spool.size / 2**20 / (time.perf_counter() - t0)
+        print(f"chunked     {UPLOAD_MB:>5} MB upload: +{grown:6.1f} MB RSS ({rate:.0f} MB/s, sha256 {spool.sha256[:12]}…)")
+        if grown > MAX_SPOOL_GROWTH_MB:
+            print(f"FAIL: spooling grew RSS by more than {MAX_SPOOL_GROWTH_MB} MB")
+            ok = False
+        for name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, name))
+
+        video = make_video(os.path.join(tmp, "long.mp4"), seconds=VIDEO_SECONDS, size=(640, 360))
+        stage = TrackingStage(ReIdIndex.from_herd(pd.DataFrame(columns=COLUMNS)), "video")
+        roi_motion = RoiMotion()
+
+        def on_batch(indices, frames, detections):
+            for frame, dets in zip(frames, detections):
+                matched, _ = stage.process(frame, dets)
+                roi_motion.update(frame, matched)
+
+        sampler = RssSampler()
+        sampler.start()
+        stats = VideoEngine(StubModel(call_ms=1, frame_ms=1), sampler=StrideSampler(3)).run(video, on_batch)
+        samples = sampler.stop()
+        half = len(samples) // 2
+        drift = max(samples[half:]) - max(samples[:half])
+        print(f"video {stats['decoded_frames']} frames: RSS {min(samples):.0f}–{max(samples):.0f} MB, "
+              f"second half vs first: {drift:+.1f} MB")
+        if drift > MAX_DRIFT_MB:
+            print(f"FAIL: RSS kept growing while processing (>{MAX_DRIFT_MB} MB)")
+            ok = False
+
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Benchmark suite for the detection, ID and storage hot paths, runnable
+offline (synthetic frames / videos, stub model, throwaway stores).
+
+    python -m benchmarks.suite                                # run all, write bench_results.json
+    python -m benchmarks.suite --only video_fps upsert_animal   # case names or prefixes
+    python -m benchmarks.suite --out base.json                # save a baseline ...
+    python -m benchmarks.suite --baseline base.json           # ... and compare a later run with it
+
+Every case is run once to warm up, then --repeat times on a fresh store;
+the median is kept. With --baseline
+each result is compared with the saved one; a result worse by more than
+--threshold (default 15%) is a regression and the exit status is 1.
+Baselines are only meaningful on the same machine.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from backend import database
+from benchmarks import common
+from benchmarks.common import StubModel, load_detector, make_video
+
+HERD_SIZES = [10, 1000, 100_000]
+UPSERTS = 200
+IMAGES = 100
+CROPS = 2000
+KNOWN_HASHES = 1000
+DASHBOARD_HERD = 10_000
+
+CASES = {}
+
+
+def case(name, unit, higher_is_better=False):
+    """Register a benchmark: fn(ctx) → value (one run)."""
+    def register(fn):
+        CASES[name] = {"fn": fn, "unit": unit, "higher_is_better": higher_is_better}
+        return fn
+    return register
+
+
+def use_store(root):
+    """Point backend.database at a fresh store under root."""
+    common.use_store(root)
+    database.init_db()
+
+
+def seed_herd(n):
+    rng = np.random.default_rng(0)
+    database.save_db(pd.DataFrame({
+        "animal_id": [f"COW_{i:08x}" for i in range(n)],
+        "animal_type": rng.choice(["Cow", "Goat", "Sheep"], n),
+        "display_name": "Cow",
+        "attendance": rng.integers(1, 100, n),
+        "health_status": np.where(rng.random(n) < 0.05, "Needs Vet Support", "Healthy"),
+        "last_seen": "2026-01-01 00:00:00"
+    }))
+
+
+def synthetic_frame(rng, size=(1280, 720)):
+    w, h = size
+    return rng.integers(40, 200, (h, w, 3), dtype=np.uint8)
+
+
+# ---------- cases ----------
+@case("image_detection_ms", "ms/image")
+def image_detection(ctx):
+    """Upload path of the Detection page: model → boxes → crops → IDs → sightings."""
+    from vision.config import DetectionConfig
+    from vision.detection import crop_of, make_sighting, parse_results
+    from vision.reid import ReIdIndex
+
+    model, config, reid = ctx["model"], DetectionConfig(), ReIdIndex()
+    rng = np.random.default_rng(1)
+    images = [synthetic_frame(rng) for _ in range(IMAGES)]
+    start = time.perf_counter()
+    for img in images:
+        sightings = []
+        for det in parse_results(model(img, **config.options(model.names, "image"))[0]):
+            crop = crop_of(img, det.xyxy)
+            if crop.size:
+                animal_id, crop_hash = reid.identify(crop, det.animal.capitalize())
+                sightings.append(make_sighting(animal_id, crop_hash, det, "image"))
+        database.record_sightings(sightings)
+    return (time.perf_counter() - start) / len(images) * 1000
+
+
+@case("video_fps", "frames/s", higher_is_better=True)
+def video_fps(ctx):
+    """Recorded video: decode → batched inference → tracking → sighting log."""
+    from vision.reid import ReIdIndex
+    from vision.sampling import StrideSampler
+    from vision.tracker import TrackingStage
+    from vision.video import VideoEngine
+
+    stage = TrackingStage(ReIdIndex(), "video")
+
+    def on_batch(indices, frames, detections):
+        for frame, dets in zip(frames, detections):
+            database.record_sightings(stage.process(frame, dets)[1])
+
+    return VideoEngine(ctx["model"], sampler=StrideSampler(3)).run(ctx["video"], on_batch)["fps"]
+
+
+@case("reid_identify_us", "us/crop")
+def reid_identify(ctx):
+    """gen_id: hash a crop and match it against KNOWN_HASHES animals."""
+    from vision.reid import ReIdIndex
+
+    rng = np.random.default_rng(2)
+    index = ReIdIndex()
+    for i, h in enumerate(rng.integers(0, 2**63, KNOWN_HASHES, dtype=np.int64)):
+        index.add(int(h), "Cow", f"COW_{i:08x}")
+    crops = [rng.integers(0, 255, (120, 160, 3), dtype=np.uint8) for _ in range(CROPS)]
+    start = time.perf_counter()
+    for crop in crops:
+        index.identify(crop, "Cow")
+    return (time.perf_counter() - start) / len(crops) * 1e6
+
+
+def upsert_case(n):
+    def run(ctx):
+        """upsert_animal against a herd of n: half re-sightings, half new animals."""
+        seed_herd(n)
+        database.get_alerts()   # one-off index build on a new store, not per call
+        start = time.perf_counter()
+        for i in range(UPSERTS):
+            animal_id = f"COW_{(i * 7919) % n:08x}" if i % 2 else f"NEW_{i:08x}"
+            database.upsert_animal(animal_id, "Cow", "Healthy")
+        return (time.perf_counter() - start) / UPSERTS * 1000
+    return run
+
+
+for _n in HERD_SIZES:
+    case(f"upsert_animal_ms@{_n}", "ms/call")(upsert_case(_n))
+
+
+@case("dashboard_load_ms", "ms")
+def dashboard_load(ctx):
+    """Dashboard after a herd change: herd + indexed view rebuild + first page."""
+    seed_herd(DASHBOARD_HERD)
+    database.upsert_animal("COW_00000001", "Cow", "Needs Vet Support")
+    start = time.perf_counter()
+    view = database.get_herd_view()   # summary aggregates are built here
+    view.page(types=["Cow"], sort="last_seen")
+    return (time.perf_counter() - start) * 1000
+
+
+@case("motion_fps", "frames/s", higher_is_better=True)
+def motion_fps(ctx):
+    """Behavior page: frame-to-frame motion over every frame of the video."""
+    from vision.motion import analyze_motion
+    from vision.sampling import StrideSampler
+
+    start = time.perf_counter()
+    stats = analyze_motion(ctx["video"], StrideSampler(1))
+    return stats.samples / (time.perf_counter() - start)
+
+
+# ---------- running / comparing ----------
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(names, repeat, real=False):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = {
+            # No sleeps: the stub only hands back boxes, so our own code is what is timed
+            "model": load_detector(real) if real else StubModel(call_ms=0, frame_ms=0),
+            "video": make_video(os.path.join(tmp, "pen.mp4"), seconds=20, size=(1280, 720))
+        }
+        for name in names:
+            spec = CASES[name]
+            values = []
+            for r in range(repeat + 1):
+                use_store(tempfile.mkdtemp(dir=tmp))
+                values.append(spec["fn"](ctx))
+            values = values[1:]   # warm-up: imports, first connections, caches
+            results[name] = {
+                "value": statistics.median(values),
+                "runs": values,
+                "unit": spec["unit"],
+                "higher_is_better": spec["higher_is_better"]
+            }
+            print(f"{name:<28} {results[name]['value']:>12.3f} {spec['unit']}")
+    return {
+        "meta": {
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+            "model": "real" if real else "stub",
+            "db_backend": database.DB_BACKEND,
+            "repeat": repeat
+        },
+        "results": results
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print current vs baseline; returns the names of regressed cases."""
+    regressions = []
+    print(f"\n{'case':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or not base["value"]:
+            print(f"{name:<28} {'-':>12} {result['value']:>12.3f}")
+            continue
+        change = result["value"] / base["value"] - 1
+        worse = -change if result["higher_is_better"] else change
+        flag = ""
+        if worse > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28} {base['value']:>12.3f} {result['value']:>12.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the detection, ID and storage hot paths")
+    parser.add_argument("--only", nargs="+", metavar="CASE", help="case names or prefixes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    parser.add_argument("--real", action="store_true", help="use the real model instead of the stub")
+    args = parser.parse_args()
+
+    names = [n for n in CASES if not args.only or n.startswith(tuple(args.only))]
+    if not names:
+        parser.error(f"no case matches {args.only}; cases: {', '.join(CASES)}")
+
+    current = run_suite(names, args.repeat, args.real)
+    with open(args.out, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
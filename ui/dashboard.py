@@ -2,10 +2,13 @@ import streamlit as st
 import pandas as pd
 
 from backend.database import (
-    get_all_animals,
-    delete_animal,
-    update_display_name
+    get_herd_view,
+    rename_many,
+    delete_many,
+    attendance_history,
+    health_history
 )
+from backend.herd_view import PAGE_SIZE
 
 # Emoji mapping (farmer-friendly)
 ANIMAL_EMOJI = {
@@ -17,35 +20,78 @@ ANIMAL_EMOJI = {
     "Bird": "🐦"
 }
 
+SORT_OPTIONS = {
+    "Last seen": ("last_seen", True),
+    "Name": ("display_name", False),
+    "Attendance": ("attendance", True),
+    "Needs vet first": ("health_status", True)
+}
+
 def render_dashboard():
     st.subheader("📊 Farm Dashboard")
 
-    # Load data from backend
-    df = get_all_animals()
+    # Indexed snapshot of the herd, rebuilt only when the herd changes
+    view = get_herd_view()
+    summary = view.summary
 
-    if df.empty:
+    if summary["total"] == 0:
         st.info("No animals recorded yet.")
         return
 
-    # View toggle
-    col_toggle, _ = st.columns([1, 5])
+    # Summary (precomputed aggregates)
+    cols = st.columns(3)
+    cols[0].metric("Animals", summary["total"])
+    cols[1].metric("Seen today", summary["seen_today"])
+    cols[2].metric("Needs vet", summary["needs_vet"])
+    st.caption(" · ".join(
+        f"{ANIMAL_EMOJI.get(t, '🐾')} {t}: {n}" for t, n in summary["by_type"].items()
+    ))
+
+    # History (from the sighting archive; cached until the next compaction adds a part)
+    with st.expander("📈 Last 30 days"):
+        attendance = attendance_history(30)
+        if attendance.empty:
+            st.caption("No history recorded yet.")
+        else:
+            st.caption("Animals seen per day")
+            st.line_chart(attendance.set_index("day")["animals"])
+
+            trend = health_history(30)
+            st.caption("Share of sightings needing vet support")
+            st.line_chart(trend.set_index("day")["unhealthy_share"])
+
+    # Filters / sort / view toggle
+    col_type, col_health, col_sort, col_toggle = st.columns([2, 2, 2, 1])
+    with col_type:
+        types = st.multiselect("Type", view.animal_types)
+    with col_health:
+        health = st.multiselect("Health", view.health_statuses)
+    with col_sort:
+        sort, descending = SORT_OPTIONS[st.selectbox("Sort by", list(SORT_OPTIONS))]
     with col_toggle:
         table_view = st.toggle("📋 Table View")
 
+    matches = view.count(types, health)
+    pages = max(1, -(-matches // PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1) - 1
+    page_df, _ = view.page(types, health, sort, descending, page)
+    st.caption(f"{matches} animals · page {page + 1} of {pages}")
+
     st.markdown("---")
 
     # ---------------- TABLE VIEW ----------------
     if table_view:
-        table_df = df[
-            ["display_name", "animal_type", "health_status", "attendance", "last_seen"]
+        table_df = page_df[
+            ["display_name", "animal_type", "health_status", "behavior", "attendance",
+             "last_seen", "camera_id"]
         ]
-        st.dataframe(table_df, use_container_width=True)
+        st.dataframe(table_df, use_container_width=True, hide_index=True)
 
     # ---------------- CARD VIEW ----------------
     else:
         cols = st.columns(3)
 
-        for idx, row in df.iterrows():
+        for idx, row in enumerate(page_df.to_dict("records")):
             with cols[idx % 3]:
                 st.markdown("<div class='card'>", unsafe_allow_html=True)
 
@@ -55,6 +101,10 @@ def render_dashboard():
                 st.caption(f"Type: {row['animal_type']}")
                 st.caption(f"Attendance: {row['attendance']}")
                 st.caption(f"Last seen: {row['last_seen']}")
+                if isinstance(row["camera_id"], str):
+                    st.caption(f"Camera: {row['camera_id']}")
+                if isinstance(row["behavior"], str):
+                    st.caption(f"Behavior: {row['behavior']}")
 
                 if row["health_status"] == "Healthy":
                     st.markdown(
@@ -71,19 +121,29 @@ def render_dashboard():
                         key=f"vet_{row['animal_id']}"
                     )
 
-                # Rename animal
-                new_name = st.text_input(
-                    "Rename",
-                    value=row["display_name"],
-                    key=f"name_{row['animal_id']}"
-                )
-
-                if new_name != row["display_name"]:
-                    update_display_name(row["animal_id"], new_name)
-
-                # Delete animal
-                if st.button("❌ Delete", key=f"del_{row['animal_id']}"):
-                    delete_animal(row["animal_id"])
-                    st.rerun()
-
                 st.markdown("</div>", unsafe_allow_html=True)
+
+    # Edits are batched: nothing is written until the form is submitted,
+    # then all renames and all deletions are one commit each
+    with st.expander("✏️ Edit names"):
+        with st.form(f"edit_page_{page}"):
+            edits = []
+            for row in page_df.to_dict("records"):
+                col_name, col_del = st.columns([4, 1])
+                with col_name:
+                    name = st.text_input(
+                        f"{ANIMAL_EMOJI.get(row['animal_type'], '🐾')} {row['animal_type']}",
+                        value=row["display_name"],
+                        key=f"name_{row['animal_id']}"
+                    )
+                with col_del:
+                    remove = st.checkbox("❌ Delete", key=f"del_{row['animal_id']}")
+                edits.append((row, name, remove))
+
+            if st.form_submit_button("💾 Save changes"):
+                delete_many([row["animal_id"] for row, _, remove in edits if remove])
+                rename_many({
+                    row["animal_id"]: name for row, name, remove in edits
+                    if not remove and name and name != row["display_name"]
+                })
+                st.rerun()
@@ -0,0 +1,67 @@
+import streamlit as st
+import pandas as pd
+
+from backend.metrics import REGISTRY
+
+# Headline numbers: (label, metric, field, unit)
+HEADLINES = [
+    ("Inference p50", "farm_inference_ms_per_frame", "p50", "ms"),
+    ("Inference p95", "farm_inference_ms_per_frame", "p95", "ms"),
+    ("Boxes / frame", "farm_boxes_per_frame", "mean", ""),
+    ("Re-ID p95", "farm_reid_identify_ms", "p95", "ms"),
+    ("Video decode p95", "farm_video_decode_ms", "p95", "ms"),
+    ("DB read p95", "farm_db_read_ms", "p95", "ms"),
+    ("DB write p95", "farm_db_write_ms", "p95", "ms"),
+    ("Camera latency p95", "farm_camera_latency_ms", "p95", "ms"),
+]
+
+def _fmt(value, unit=""):
+    if value != value:   # NaN: gauge source not available
+        return "–"
+    return f"{value:,.1f}{' ' + unit if unit else ''}"
+
+def render_performance():
+    st.markdown("### ⚙ System Performance")
+    snapshot = REGISTRY.snapshot()
+
+    model = snapshot.get("farm_model_load_seconds")
+    if model:
+        st.success(f"✔ AI Model: loaded in {model['value']:.1f} s")
+    else:
+        st.info("AI Model: loads on first use (Detection / Live Camera)")
+
+    cols = st.columns(4)
+    for i, (label, name, field, unit) in enumerate(HEADLINES):
+        metric = snapshot.get(name)
+        value = _fmt(metric[field], unit) if metric and metric.get("count") else "–"
+        cols[i % 4].metric(label, value)
+
+    cols = st.columns(4)
+    hit_rate = snapshot.get("farm_herd_cache_hit_rate")
+    cols[0].metric("Herd cache hits", f"{hit_rate['value']:.0%}" if hit_rate else "–")
+    for col, (label, name) in zip(cols[1:], [
+        ("Video queue", "farm_video_queue_depth"),
+        ("Storage queue", "farm_persist_queue_depth"),
+        ("Active jobs", "farm_jobs_active"),
+    ]):
+        gauge = snapshot.get(name)
+        col.metric(label, _fmt(gauge["value"]) if gauge else "–")
+
+    with st.expander("All metrics"):
+        rows = [
+            {
+                "metric": name,
+                "type": m["type"],
+                "count / value": m.get("count", m.get("value")),
+                "p50": m.get("p50"),
+                "p95": m.get("p95"),
+                "max": m.get("max"),
+            }
+            for name, m in sorted(snapshot.items())
+        ]
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        st.caption("Measured in this server process; background video jobs run in their own workers.")
+
+        col_json, col_prom = st.columns(2)
+        col_json.download_button("⬇ JSON", REGISTRY.to_json(), "metrics.json", "application/json")
+        col_prom.download_button("⬇ Prometheus", REGISTRY.to_prometheus(), "metrics.prom", "text/plain")
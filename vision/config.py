@@ -0,0 +1,74 @@
+import functools
+import json
+import os
+
+from backend.locking import atomic_write
+
+CONFIG_FILE = "detection.json"
+
+# COCO animals worth tracking on a farm, and the ones detected by default
+FARM_CLASSES = ["cow", "sheep", "horse", "bird", "dog", "cat"]
+LIVESTOCK_CLASSES = ["cow", "sheep", "horse", "bird"]
+
+INPUT_SIZES = [320, 416, 480, 640]
+
+# Model input size per source; camera ids ("cam1", ...) may override "camera"
+DEFAULT_IMGSZ = {"image": 640, "video": 640, "camera": 320}
+
+
+class DetectionConfig:
+    """
+    What the detector is asked for, applied inside the model call: only
+    allowlisted classes survive NMS, so people, cars and chairs never reach
+    cropping, hashing or the database. Input size is chosen per source —
+    small for wide overview cameras, full size for close-ups.
+    """
+
+    def __init__(self, classes=None, conf=0.25, iou=0.45, max_det=50, imgsz=None):
+        self.classes = list(LIVESTOCK_CLASSES if classes is None else classes)
+        self.conf = conf
+        self.iou = iou
+        self.max_det = max_det
+        self.imgsz = dict(DEFAULT_IMGSZ, **(imgsz or {}))
+
+    def input_size(self, *keys):
+        """First configured size among keys (e.g. camera id, then "camera")."""
+        for key in keys:
+            if key in self.imgsz:
+                return self.imgsz[key]
+        return DEFAULT_IMGSZ["image"]
+
+    def options(self, names, *keys):
+        """Keyword arguments for the model call; `names` maps class id → name."""
+        items = names.items() if isinstance(names, dict) else enumerate(names)
+        return {
+            "classes": [i for i, name in items if name in self.classes],
+            "conf": self.conf,
+            "iou": self.iou,
+            "max_det": self.max_det,
+            "imgsz": self.input_size(*keys)
+        }
+
+    def bind(self, model, *keys):
+        """The model with this config's options filled in, for one source."""
+        return functools.partial(model, **self.options(model.names, *keys))
+
+    # ---------- persistence ----------
+    def to_dict(self):
+        return {
+            "classes": self.classes,
+            "conf": self.conf,
+            "iou": self.iou,
+            "max_det": self.max_det,
+            "imgsz": self.imgsz
+        }
+
+    def save(self, path=CONFIG_FILE):
+        atomic_write(path, lambda f: json.dump(self.to_dict(), f, indent=2))
+
+    @classmethod
+    def load(cls, path=CONFIG_FILE):
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls(**json.load(f))
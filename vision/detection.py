@@ -0,0 +1,61 @@
+from collections import namedtuple
+
+import numpy as np
+
+from backend import metrics
+
+# Shared by every detection path (image upload, video engine, live cameras)
+BOXES = metrics.histogram("farm_boxes_per_frame", "Detections per frame", metrics.COUNT_BUCKETS)
+INFERENCE_MS = metrics.histogram("farm_inference_ms_per_frame", "Model time per frame (batch time / frames)")
+FRAMES = metrics.counter("farm_frames_processed_total", "Frames through the detection pipelines")
+
+# One detected box: COCO class name, confidence, integer (x1, y1, x2, y2)
+Detection = namedtuple("Detection", ["animal", "conf", "xyxy"])
+
+
+def _numpy(values):
+    # torch tensors (CPU or GPU) and plain arrays alike
+    if hasattr(values, "cpu"):
+        values = values.cpu().numpy()
+    return np.asarray(values)
+
+
+def parse_results(result):
+    """List of Detection for one ultralytics result (one frame)."""
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        BOXES.observe(0)
+        return []
+    BOXES.observe(len(boxes))
+    xyxy = _numpy(boxes.xyxy).astype(int)
+    cls = _numpy(boxes.cls).astype(int)
+    conf = _numpy(boxes.conf).astype(float)
+    return [
+        Detection(result.names[c], float(p), tuple(int(v) for v in b))
+        for b, c, p in zip(xyxy, cls, conf)
+    ]
+
+
+def crop_of(frame, xyxy):
+    x1, y1, x2, y2 = xyxy
+    return frame[max(0, y1):y2, max(0, x1):x2]
+
+
+def health(conf):
+    return "Healthy" if conf >= 0.6 else "Needs Vet Support"
+
+
+def make_sighting(animal_id, crop_hash, det, source, camera_id=None):
+    """Sighting record for backend.database.record_sightings."""
+    sighting = {
+        "animal_id": animal_id,
+        "phash": crop_hash,
+        "animal_type": det.animal.capitalize(),
+        "confidence": det.conf,
+        "health_status": health(det.conf),
+        "source": source,
+        "bbox": det.xyxy
+    }
+    if camera_id is not None:
+        sighting["camera_id"] = camera_id
+    return sighting
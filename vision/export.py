@@ -0,0 +1,113 @@
+"""
+One-time model export for the ONNX Runtime backends.
+
+    python -m vision.export                      # yolov8n.pt → yolov8n.onnx
+    python -m vision.export --int8 barn.mp4      # + yolov8n-int8.onnx, calibrated on barn.mp4
+    python -m vision.export --int8 frames/       # ... or on a folder of images
+
+INT8 uses static quantization calibrated on your own frames (what your
+cameras actually see). Without a calibration source it falls back to
+dynamic quantization, which is quicker to produce but faster only for
+the few layers ONNX Runtime quantizes on the fly.
+"""
+import argparse
+import os
+import shutil
+
+import cv2
+
+from vision.inference import INPUT_SIZE, MODEL_FILES, letterbox, to_blob
+
+CALIBRATION_FRAMES = 64
+
+
+def export_onnx(weights=MODEL_FILES["torch"], out=MODEL_FILES["onnx"], imgsz=INPUT_SIZE):
+    """Export the .pt weights with a dynamic batch and input size."""
+    from ultralytics import YOLO
+    exported = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+    if os.path.abspath(exported) != os.path.abspath(out):
+        shutil.move(exported, out)
+    return out
+
+
+def calibration_frames(source, limit=CALIBRATION_FRAMES):
+    """Up to `limit` frames spread over a video file or a folder of images."""
+    if os.path.isdir(source):
+        names = sorted(n for n in os.listdir(source) if n.lower().endswith((".jpg", ".jpeg", ".png")))
+        step = max(1, len(names) // limit)
+        for name in names[::step][:limit]:
+            frame = cv2.imread(os.path.join(source, name))
+            if frame is not None:
+                yield frame
+        return
+
+    cap = cv2.VideoCapture(source)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    step = max(1, total // limit)
+    for index in range(0, max(total, 1), step)[:limit]:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ok, frame = cap.read()
+        if not ok:
+            break
+        yield frame
+    cap.release()
+
+
+def quantize_int8(model=MODEL_FILES["onnx"], out=MODEL_FILES["onnx-int8"], source=None, imgsz=INPUT_SIZE):
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    if source is None:
+        quantize_dynamic(model, out, weight_type=QuantType.QUInt8)
+        return out
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self, input_name):
+            self.input_name = input_name
+            self.frames = calibration_frames(source)
+
+        def get_next(self):
+            frame = next(self.frames, None)
+            if frame is None:
+                return None
+            return {self.input_name: to_blob([letterbox(frame, imgsz)[0]])}
+
+    import onnxruntime as ort
+    input_name = ort.InferenceSession(model, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    prepared = out + ".prep.onnx"
+    quant_pre_process(model, prepared)
+    try:
+        quantize_static(
+            prepared, out, FrameReader(input_name),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True
+        )
+    finally:
+        os.remove(prepared)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export YOLO for the ONNX Runtime backends")
+    parser.add_argument("--weights", default=MODEL_FILES["torch"])
+    parser.add_argument("--imgsz", type=int, default=INPUT_SIZE)
+    parser.add_argument(
+        "--int8", nargs="?", const="", metavar="CALIBRATION",
+        help="also write the INT8 model; calibrate on a video file or image folder"
+    )
+    args = parser.parse_args()
+
+    onnx_path = export_onnx(args.weights, imgsz=args.imgsz)
+    print(f"wrote {onnx_path}")
+    if args.int8 is not None:
+        int8_path = quantize_int8(onnx_path, source=args.int8 or None, imgsz=args.imgsz)
+        print(f"wrote {int8_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import ast
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from backend import metrics
+
+# Backend → model file in the project root
+MODEL_FILES = {
+    "torch": "./yolov8n.pt",
+    "onnx": "./yolov8n.onnx",
+    "onnx-int8": "./yolov8n-int8.onnx"
+}
+
+DEFAULT_BACKEND = os.environ.get("FARM_INFERENCE_BACKEND", "torch")
+
+INPUT_SIZE = 640
+
+
+class Boxes:
+    """Same fields parse_results reads from an ultralytics result."""
+
+    def __init__(self, xyxy, cls, conf):
+        self.xyxy = xyxy
+        self.cls = cls
+        self.conf = conf
+
+    def __len__(self):
+        return len(self.conf)
+
+
+class Result:
+    def __init__(self, boxes, names):
+        self.boxes = boxes
+        self.names = names
+
+
+class TorchDetector:
+    """The original path: ultralytics + PyTorch on the .pt weights."""
+
+    def __init__(self, path=MODEL_FILES["torch"]):
+        from ultralytics import YOLO
+        self.model = YOLO(path)
+        self.names = self.model.names
+
+    def __call__(self, frames, **options):
+        return self.model(frames, verbose=False, **options)
+
+
+def letterbox(frame, size):
+    """Resize keeping aspect ratio, pad to size×size. → (image, ratio, (pad_x, pad_y))"""
+    h, w = frame.shape[:2]
+    ratio = min(size / h, size / w)
+    nw, nh = round(w * ratio), round(h * ratio)
+    pad_x, pad_y = (size - nw) // 2, (size - nh) // 2
+    out = np.full((size, size, 3), 114, dtype=np.uint8)
+    out[pad_y:pad_y + nh, pad_x:pad_x + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return out, ratio, (pad_x, pad_y)
+
+
+def to_blob(images):
+    """Letterboxed BGR uint8 images → NCHW float32 RGB in 0..1."""
+    blob = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(blob, dtype=np.float32) / 255.0
+
+
+def decode(pred, ratio, pad, shape, conf=0.25, iou=0.45, classes=None, max_det=300):
+    """
+    One image's raw YOLOv8 head output (4 + classes, anchors) → Boxes in
+    original-frame pixels, after confidence filter and per-class NMS.
+    """
+    pred = pred.T
+    scores = pred[:, 4:]
+    cls = scores.argmax(axis=1)
+    best = scores[np.arange(len(cls)), cls]
+    keep = best >= conf
+    if classes is not None:
+        keep &= np.isin(cls, classes)
+    pred, cls, best = pred[keep], cls[keep], best[keep]
+    if len(best) == 0:
+        return Boxes(np.empty((0, 4)), np.empty(0, dtype=int), np.empty(0))
+
+    cx, cy, w, h = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+    xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+    # Per-class NMS in one call: shift every class into its own region
+    shifted = xyxy + (cls * 4096.0)[:, None]
+    rects = np.column_stack([shifted[:, :2], shifted[:, 2:] - shifted[:, :2]])
+    idx = np.asarray(cv2.dnn.NMSBoxes(rects.tolist(), best.tolist(), conf, iou), dtype=int).reshape(-1)
+    idx = idx[np.argsort(-best[idx])][:max_det]
+
+    xyxy = (xyxy[idx] - [pad[0], pad[1], pad[0], pad[1]]) / ratio
+    xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, shape[1])
+    xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, shape[0])
+    return Boxes(xyxy, cls[idx], best[idx])
+
+
+class OnnxDetector:
+    """
+    YOLOv8 exported to ONNX (see vision.export), run with ONNX Runtime on
+    the CPU — no PyTorch import, a fraction of the memory. Returns
+    Result objects with the same boxes.xyxy / cls / conf + names as
+    ultralytics, so the detection loops don't change.
+    """
+
+    def __init__(self, path=MODEL_FILES["onnx"], threads=None):
+        import onnxruntime as ort
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found — run `python -m vision.export` first")
+        opts = ort.SessionOptions()
+        if threads:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        self.input = self.session.get_inputs()[0].name
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(meta["names"]) if "names" in meta else {}
+        fixed = self.session.get_inputs()[0].shape[-1]
+        self.dynamic = not isinstance(fixed, int)   # exported with dynamic=True
+        self.imgsz = INPUT_SIZE if self.dynamic else fixed
+
+    def __call__(self, frames, conf=0.25, iou=0.45, classes=None, max_det=300, imgsz=None, **_):
+        if not isinstance(frames, list):
+            frames = [frames]
+        size = (imgsz or self.imgsz) if self.dynamic else self.imgsz
+        boxed = [letterbox(f, size) for f in frames]
+        out = self.session.run(None, {self.input: to_blob([b[0] for b in boxed])})[0]
+        return [
+            Result(decode(pred, ratio, pad, f.shape, conf, iou, classes, max_det), self.names)
+            for pred, (_, ratio, pad), f in zip(out, boxed, frames)
+        ]
+
+
+def load_detector(backend=DEFAULT_BACKEND, path=None):
+    """Detector for `backend` (torch / onnx / onnx-int8), same call interface."""
+    if backend not in MODEL_FILES:
+        raise ValueError(f"Unknown inference backend {backend!r}; choose from {sorted(MODEL_FILES)}")
+    path = path or MODEL_FILES[backend]
+    if backend == "torch":
+        return TorchDetector(path)
+    return OnnxDetector(path)
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def shared_detector(backend=DEFAULT_BACKEND):
+    """
+    Process-wide detector, loaded on first use. Thread-safe: a request
+    arriving while a background prewarm is still loading waits for it.
+    """
+    with _shared_lock:
+        if backend not in _shared:
+            start = time.perf_counter()
+            _shared[backend] = load_detector(backend)
+            metrics.gauge("farm_model_load_seconds", "Time to load the shared detector").set(
+                time.perf_counter() - start
+            )
+        return _shared[backend]
+
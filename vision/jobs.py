@@ -0,0 +1,283 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from backend import metrics
+from backend.locking import atomic_write
+from backend.uploads import spool_upload, sweep
+
+JOBS_DIR = "jobs"
+JOB_WORKERS = int(os.environ.get("FARM_JOB_WORKERS", "2"))
+CHECKPOINT_INTERVAL = 2.0   # seconds between checkpoints while a job runs
+
+ACTIVE = ("queued", "running")
+RETRYABLE = ("failed",)   # spool kept, so retry() can resume from the checkpoint
+
+
+class JobStore:
+    """One JSON file per job under root; writes are atomic replaces."""
+
+    def __init__(self, root=JOBS_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, job_id):
+        return os.path.join(self.root, job_id + ".json")
+
+    def create(self, kind, name, spool, options=None):
+        """New queued job for a Spool (path, sha256, size)."""
+        job = {
+            "id": os.path.splitext(os.path.basename(spool.path))[0],
+            "kind": kind,
+            "name": name,
+            "spool": spool.path,
+            "sha256": spool.sha256,
+            "size": spool.size,
+            "status": "queued",
+            "progress": 0.0,
+            "offset": 0,          # next frame to process (checkpoint)
+            "motion": {},         # raw RoiMotion sums up to the checkpoint
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "options": options or {},
+            "error": None,
+            "stats": None
+        }
+        self.write(job)
+        return job
+
+    def write(self, job):
+        atomic_write(self._path(job["id"]), lambda f: json.dump(job, f))
+
+    def read(self, job_id):
+        try:
+            with open(self._path(job_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def update(self, job_id, **fields):
+        job = self.read(job_id)
+        job.update(fields)
+        self.write(job)
+        return job
+
+    def all(self):
+        """Every job, newest first."""
+        jobs = []
+        for name in os.listdir(self.root):
+            if name.endswith(".json"):
+                job = self.read(name[:-5])
+                if job is not None:
+                    jobs.append(job)
+        return sorted(jobs, key=lambda j: j["created"], reverse=True)
+
+
+# ---------- worker process ----------
+_model = None
+
+
+def _init_worker(model_factory):
+    global _model
+    _model = model_factory()
+
+
+def _load_detector():
+    from vision.inference import load_detector
+    return load_detector()
+
+
+def run_video_job(root, job_id):
+    """Process (or resume) one video job inside a worker process."""
+    from backend.database import flush_sightings, get_all_animals, record_sightings, set_behaviors
+    from vision.config import DetectionConfig
+    from vision.motion import (
+        MIN_TRACK_SAMPLES, MotionGate, RoiMotion, SAMPLES_PER_SECOND, behaviors_from_totals,
+        merge_totals
+    )
+    from vision.reid import ReIdIndex
+    from vision.sampling import TimeSampler
+    from vision.tracker import TrackingStage
+    from vision.video import VideoEngine
+
+    store = JobStore(root)
+    job = store.update(job_id, status="running", error=None)
+    try:
+        stage = TrackingStage(ReIdIndex.from_herd(get_all_animals()), "video")
+        roi_motion = RoiMotion()
+        # Sightings since the last checkpoint are held back and written with
+        # it: everything logged is before the saved offset, so a resumed job
+        # never records a frame's sightings twice. Motion is checkpointed as
+        # raw sums (no per-track minimum) so a track cut by a checkpoint
+        # still counts once its halves are added up.
+        state = {"next": job["offset"], "saved_at": time.monotonic(), "sightings": []}
+
+        def checkpoint(progress):
+            record_sightings(state["sightings"])
+            state["sightings"] = []
+            flush_sightings()
+            store.update(
+                job_id, offset=state["next"], progress=progress,
+                motion=merge_totals(job["motion"], roi_motion.totals(min_samples=0))
+            )
+            state["saved_at"] = time.monotonic()
+
+        def on_batch(indices, frames, detections):
+            for frame, dets in zip(frames, detections):
+                matched, sightings = stage.process(frame, dets)
+                roi_motion.update(frame, matched)
+                state["sightings"].extend(sightings)
+            state["next"] = indices[-1] + 1
+
+        def on_progress(decoded, total):
+            if time.monotonic() - state["saved_at"] >= CHECKPOINT_INTERVAL:
+                checkpoint(min(1.0, decoded / max(1, total)))
+
+        engine = VideoEngine(
+            DetectionConfig.load().bind(_model, "video"),
+            sampler=TimeSampler(SAMPLES_PER_SECOND),
+            gate=MotionGate()
+        )
+        stats = engine.run(job["spool"], on_batch, on_progress, start=job["offset"])
+
+        record_sightings(state["sightings"])
+        flush_sightings()
+        motion = merge_totals(job["motion"], roi_motion.totals(min_samples=0))
+        behaviors = behaviors_from_totals(merge_totals(motion, min_samples=MIN_TRACK_SAMPLES))
+        set_behaviors({a: label for a, (label, _) in behaviors.items()})
+        store.update(
+            job_id, status="done", progress=1.0, offset=state["next"], motion=motion,
+            stats={k: stats[k] for k in ("decoded_frames", "processed_frames", "fps")}
+        )
+    except Exception as exc:
+        # The spool stays: retry() resumes the job from its last checkpoint
+        store.update(job_id, status="failed", error=f"{type(exc).__name__}: {exc}")
+        raise
+    _remove_spool(job)
+
+
+def run_behavior_job(root, job_id):
+    """Whole-video motion → behavior label for one uploaded video."""
+    from vision.motion import analyze_motion, classify_behavior
+
+    store = JobStore(root)
+    job = store.update(job_id, status="running", error=None)
+    try:
+        # Default sampling (SAMPLES_PER_SECOND): the rate classify_behavior's thresholds are set for
+        stats = analyze_motion(job["spool"])
+        behavior, explanation = classify_behavior(stats)
+        seconds, motion = stats.per_second()
+        store.update(
+            job_id, status="done", progress=1.0,
+            stats={
+                "samples": stats.samples, "mean": stats.mean, "p95": stats.p95,
+                "behavior": behavior, "explanation": explanation,
+                "seconds": seconds.tolist(), "motion": motion.tolist()
+            }
+        )
+    except Exception as exc:
+        store.update(job_id, status="failed", error=f"{type(exc).__name__}: {exc}")
+        raise
+    _remove_spool(job)
+
+
+def _remove_spool(job):
+    """Done (or dismissed): the uploaded copy is no longer needed."""
+    if os.path.exists(job["spool"]):
+        os.remove(job["spool"])
+
+
+RUNNERS = {"video": run_video_job, "behavior": run_behavior_job}
+
+
+class JobQueue:
+    """
+    Background processing of uploaded videos: detection + tracking
+    ("video" jobs) and whole-video behavior analysis ("behavior" jobs).
+
+    Uploads are spooled to a unique file under the jobs directory and run
+    by a pool of worker processes (one model per process, so several
+    videos use several cores). Each job is a small JSON file next to its
+    spool file: status, progress and a checkpoint — the next frame to
+    process plus the per-animal motion totals so far. Sightings up to the
+    checkpoint are already flushed to the sighting log, so jobs still
+    queued or running when the app stopped are resubmitted on start and
+    continue from their checkpoint instead of starting over.
+    """
+
+    def __init__(self, root=JOBS_DIR, workers=JOB_WORKERS, model_factory=None):
+        # Imported in the workers only: the UI process never loads a model for jobs
+        model_factory = model_factory or _load_detector
+        self.store = JobStore(root)
+        # spawn: no forked copies of the UI's threads or the torch runtime
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_factory,)
+        )
+        self.futures = {}
+        metrics.gauge("farm_jobs_active", "Video jobs queued or running", fn=lambda: len(self.active()))
+        jobs = self.store.all()
+        for job in reversed(jobs):
+            if job["status"] in ACTIVE and os.path.exists(job["spool"]):
+                self._submit(job)
+        # Spool files no job refers to (crashed mid-upload, dismissed jobs)
+        sweep(root, keep=[j["spool"] for j in jobs if j["status"] in ACTIVE + RETRYABLE])
+
+    def _submit(self, job):
+        self.store.update(job["id"], status="queued")
+        runner = RUNNERS[job.get("kind", "video")]
+        self.futures[job["id"]] = self.pool.submit(runner, self.store.root, job["id"])
+
+    def submit(self, kind, upload, name, **options):
+        """
+        Spool an upload and queue a `kind` job on it. Returns the job dict —
+        the existing one if the same content is already queued or running
+        as that kind with the same options.
+        """
+        suffix = os.path.splitext(name)[1] or ".mp4"
+        spool = spool_upload(upload, self.store.root, suffix)
+        for job in self.active():
+            if (job.get("sha256"), job.get("kind"), job.get("options", {})) == (spool.sha256, kind, options):
+                os.remove(spool.path)
+                return job
+        job = self.store.create(kind, name, spool, options)
+        self._submit(job)
+        return job
+
+    def submit_video(self, upload, name):
+        return self.submit("video", upload, name)
+
+    def submit_behavior(self, upload, name):
+        """Whole-video behavior analysis (motion at SAMPLES_PER_SECOND → classify_behavior)."""
+        return self.submit("behavior", upload, name)
+
+    def retry(self, job_id):
+        """Queue a failed job again; video jobs continue from their checkpoint."""
+        job = self.store.read(job_id)
+        if job is None or job["status"] not in RETRYABLE or not os.path.exists(job["spool"]):
+            return None
+        self._submit(job)
+        return job
+
+    def dismiss(self, job_id):
+        """Give up on a failed job: delete its spooled upload."""
+        job = self.store.read(job_id)
+        if job is not None and job["status"] in RETRYABLE:
+            _remove_spool(job)
+            self.store.update(job_id, status="dismissed")
+
+    def status(self, job_id):
+        return self.store.read(job_id)
+
+    def jobs(self, limit=20):
+        return self.store.all()[:limit]
+
+    def active(self):
+        return [j for j in self.store.all() if j["status"] in ACTIVE]
+
+    def shutdown(self, wait=True):
+        self.pool.shutdown(wait=wait)
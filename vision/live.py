@@ -0,0 +1,211 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+log = logging.getLogger(__name__)
+
+
+class FileCamera:
+    """
+    Fake camera backed by a video file: frames are released at the file's
+    own fps and the file loops, so pipelines can be exercised without
+    hardware (and RTSP cameras can be stood in for locally).
+    """
+
+    def __init__(self, path, loop=True, realtime=True):
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self._cap = cv2.VideoCapture(path)
+        self._interval = 1.0 / (self._cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        self._next_at = time.monotonic()
+
+    def isOpened(self):
+        return self._cap.isOpened()
+
+    def read(self):
+        if self.realtime:
+            delay = self._next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_at = max(self._next_at + self._interval, time.monotonic() - self._interval)
+        ok, frame = self._cap.read()
+        if not ok and self.loop:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._cap.read()
+        return ok, frame
+
+    def release(self):
+        self._cap.release()
+
+
+def open_camera(source):
+    """
+    cv2.VideoCapture for a device index ("0") or stream URL, or a looping
+    FileCamera when `source` is a local video file.
+    """
+    source = str(source)
+    if source.isdigit():
+        return cv2.VideoCapture(int(source))
+    if os.path.isfile(source):
+        return FileCamera(source)
+    return cv2.VideoCapture(source)
+
+
+class Rate:
+    """Exponentially smoothed events-per-second."""
+
+    def __init__(self, alpha=0.2):
+        self.alpha = alpha
+        self.value = 0.0
+        self._last = None
+
+    def tick(self):
+        now = time.monotonic()
+        if self._last is not None and now > self._last:
+            rate = 1.0 / (now - self._last)
+            self.value = rate if self.value == 0 else self.value + self.alpha * (rate - self.value)
+        self._last = now
+
+
+class LatestFrame(threading.Thread):
+    """
+    Capture thread that reads as fast as the camera delivers and keeps only
+    the newest frame; frames nobody picked up in time are dropped instead of
+    queueing up behind a slow consumer.
+    """
+
+    def __init__(self, camera, name="capture"):
+        super().__init__(name=name, daemon=True)
+        self.camera = camera
+        self.fps = Rate()
+        self.captured = 0
+        self.dropped = 0
+        self.error = None
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._taken = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                ok, frame = self.camera.read()
+                if not ok:
+                    self.error = "Camera not accessible"
+                    break
+                with self._cond:
+                    if self._seq > self._taken:
+                        self.dropped += 1
+                    self._seq += 1
+                    self._frame = (self._seq, time.monotonic(), frame)
+                    self.captured += 1
+                    self._cond.notify_all()
+                self.fps.tick()
+        finally:
+            self.camera.release()
+            with self._cond:
+                self._cond.notify_all()
+
+    def take(self, after_seq=0, timeout=1.0):
+        """(seq, captured_at, frame) newer than after_seq, or None on timeout/stop."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: (self._frame is not None and self._frame[0] > after_seq)
+                or self._stop_event.is_set() or not self.is_alive(),
+                timeout
+            )
+            if self._frame is None or self._frame[0] <= after_seq:
+                return None
+            self._taken = self._frame[0]
+            return self._frame
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def annotate(frame, matched):
+    for track, det in matched:
+        x1, y1, x2, y2 = det.xyxy
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(
+            frame,
+            f"{det.animal} #{track.track_id} {det.conf:.2f}",
+            (x1, y1 - 10),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.6,
+            (0, 255, 0),
+            2
+        )
+    return frame
+
+
+class _Behaviors(dict):
+    """Queue item: {animal_id: label} for the behaviors sink."""
+
+
+class PersistenceSink(threading.Thread):
+    """
+    Drains sightings from a queue into `sink` in batches, off the hot path.
+    Behavior labels (put_behaviors) travel through the same queue, so the
+    sightings queued before them are stored first.
+    """
+
+    def __init__(self, sink, max_batch=256, behaviors_sink=None):
+        super().__init__(name="persist", daemon=True)
+        self.sink = sink
+        self.behaviors_sink = behaviors_sink
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.written = 0
+        self._stop_event = threading.Event()
+
+    def put(self, sightings):
+        if sightings:
+            self.queue.put(sightings)
+
+    def put_behaviors(self, behaviors):
+        if behaviors and self.behaviors_sink is not None:
+            self.queue.put(_Behaviors(behaviors))
+
+    def run(self):
+        while not (self._stop_event.is_set() and self.queue.empty()):
+            try:
+                item = self.queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            batch = []
+            while True:
+                if isinstance(item, _Behaviors):
+                    self._write(batch)
+                    batch = []
+                    self._set_behaviors(item)
+                else:
+                    batch.extend(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        if batch:
+            self.sink(batch)
+            self.written += len(batch)
+
+    def _set_behaviors(self, behaviors):
+        try:
+            self.behaviors_sink(dict(behaviors))
+        except Exception:
+            log.exception("Storing live behavior labels failed")
+
+    def stop(self):
+        self._stop_event.set()
+
@@ -0,0 +1,308 @@
+import cv2
+import numpy as np
+
+from vision.sampling import TimeSampler
+
+# Mean absolute gray-level change between samples 1/3 s apart
+LOW_ACTIVITY = 3
+HIGH_RESTLESSNESS = 25
+
+SAMPLES_PER_SECOND = 3
+
+# Motion gate: a pixel counts as changed above GATE_PIXEL_THRESHOLD gray
+# levels; the detector reruns once GATE_MIN_CHANGED of the pixels changed
+# since the last detected frame, or after GATE_MAX_SKIP skipped frames.
+GATE_PIXEL_THRESHOLD = 15
+GATE_MIN_CHANGED = 0.003
+GATE_MAX_SKIP = 30
+
+# Motion samples an animal needs before it gets a behavior label
+MIN_TRACK_SAMPLES = 3
+
+
+class _GrayShrinker:
+    """
+    BGR frame → small gray image into caller-owned buffers: a cheap
+    bilinear pass to twice the target size, then 2x2 area averaging to
+    keep sensor noise down. Buffers are allocated once, on the first frame.
+    """
+
+    def __init__(self, width):
+        self.width = width
+        self.size = None
+        self.scale = None
+
+    def allocate(self, frame):
+        h, w = frame.shape[:2]
+        self.scale = self.width / w
+        self.size = (self.width, max(1, round(h * self.scale)))
+        sw, sh = self.size
+        self._coarse = np.empty((2 * sh, 2 * sw, 3), dtype=np.uint8)
+        self._small = np.empty((sh, sw, 3), dtype=np.uint8)
+        return sh, sw
+
+    def __call__(self, frame, out):
+        sw, sh = self.size
+        cv2.resize(frame, (2 * sw, 2 * sh), dst=self._coarse, interpolation=cv2.INTER_LINEAR)
+        cv2.resize(self._coarse, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=out)
+
+
+class MotionAnalyzer:
+    """
+    Single-pass motion statistics over a stream of frames.
+
+    Frames are shrunk to `width` pixels wide and converted to gray
+    straight into a preallocated chunk buffer. Every
+    `chunk` frames, the differences of all consecutive pairs are computed
+    in one NumPy operation into a reusable int16 buffer. Nothing is
+    allocated per frame.
+    """
+
+    def __init__(self, width=160, chunk=32):
+        self.chunk = chunk
+        self._shrink = _GrayShrinker(width)
+        self._grays = None
+        self._diffs = None
+        self._times = np.empty(chunk + 1)
+        self._filled = 0
+        self._pair_means = []
+        self._pair_times = []
+
+    def feed(self, frame, t):
+        """Add a BGR frame taken at t seconds."""
+        if self._grays is None:
+            sh, sw = self._shrink.allocate(frame)
+            self._grays = np.empty((self.chunk + 1, sh, sw), dtype=np.uint8)
+            self._diffs = np.empty((self.chunk, sh, sw), dtype=np.int16)
+        self._shrink(frame, self._grays[self._filled])
+        self._times[self._filled] = t
+        self._filled += 1
+        if self._filled == self.chunk + 1:
+            self._flush()
+
+    def _flush(self):
+        n = self._filled - 1
+        if n <= 0:
+            return
+        diffs = self._diffs[:n]
+        np.subtract(self._grays[1:n + 1], self._grays[:n], out=diffs, dtype=np.int16)
+        np.abs(diffs, out=diffs)
+        self._pair_means.append(diffs.reshape(n, -1).mean(axis=1))
+        self._pair_times.append(self._times[1:n + 1].copy())
+
+        # Last frame of this chunk is the first of the next one
+        self._grays[0] = self._grays[n]
+        self._times[0] = self._times[n]
+        self._filled = 1
+
+    def result(self):
+        """MotionStats over everything fed so far."""
+        self._flush()
+        if not self._pair_means:
+            return MotionStats(np.empty(0), np.empty(0))
+        return MotionStats(np.concatenate(self._pair_means), np.concatenate(self._pair_times))
+
+
+class MotionStats:
+    """Per-pair motion values with their timestamps, plus aggregates."""
+
+    def __init__(self, values, times):
+        self.values = values
+        self.times = times
+
+    @property
+    def samples(self):
+        return len(self.values)
+
+    @property
+    def mean(self):
+        # Averaged over the diffed pairs only — not over every video frame
+        return float(self.values.mean()) if self.samples else 0.0
+
+    @property
+    def p95(self):
+        return float(np.percentile(self.values, 95)) if self.samples else 0.0
+
+    def per_second(self):
+        """(seconds, mean motion) arrays — one entry per second with samples."""
+        if not self.samples:
+            return np.empty(0, dtype=int), np.empty(0)
+        seconds = self.times.astype(int)
+        counts = np.bincount(seconds)
+        sums = np.bincount(seconds, weights=self.values)
+        present = np.nonzero(counts)[0]
+        return present, sums[present] / counts[present]
+
+
+def analyze_motion(video_path, sampler=None, width=160):
+    """Run the motion engine over a video file (default: 3 samples/s)."""
+    sampler = sampler or TimeSampler(SAMPLES_PER_SECOND)
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    analyzer = MotionAnalyzer(width=width)
+    for index, frame in sampler.frames(cap):
+        analyzer.feed(frame, index / fps)
+    cap.release()
+    return analyzer.result()
+
+
+def classify_behavior(stats):
+    """(label, farmer-friendly explanation) from motion statistics."""
+    if stats.samples == 0:
+        return "Unknown", "Video could not be analyzed"
+    if stats.mean < LOW_ACTIVITY:
+        return (
+            "Low Activity",
+            "Animal is moving very little. This can indicate weakness, illness, or tiredness."
+        )
+    if stats.mean > HIGH_RESTLESSNESS:
+        return (
+            "High Restlessness",
+            "Animal is moving too much. This can indicate stress, discomfort, or pain."
+        )
+    return (
+        "Normal Behavior",
+        "Animal movement appears normal."
+    )
+
+
+class RoiMotion:
+    """
+    Per-animal motion measured only inside each tracked animal's box.
+
+    Every processed frame is shrunk once to a small gray image (two
+    preallocated buffers, swapped); for each track seen in this and the
+    previous frame, only its box region is diffed. A tractor passing in the
+    background or grass moving in the wind no longer counts as the herd's
+    restlessness, and the diff work scales with the animals' area rather
+    than the camera's field of view.
+    """
+
+    def __init__(self, width=320, min_samples=MIN_TRACK_SAMPLES):
+        self.min_samples = min_samples
+        self._shrink = _GrayShrinker(width)
+        self._cur = None
+        self._prev = None
+        self._frame_no = 0
+        self._last_seen = {}     # track_id → frame_no
+        self._sums = {}          # track_id → [sum, count, animal_id]
+
+    def update(self, frame, matched):
+        """Add one processed frame with its [(track, detection)] matches."""
+        if self._cur is None:
+            sh, sw = self._shrink.allocate(frame)
+            self._cur = np.empty((sh, sw), dtype=np.uint8)
+            self._prev = np.empty_like(self._cur)
+        self._prev, self._cur = self._cur, self._prev
+        self._shrink(frame, self._cur)
+        self._frame_no += 1
+
+        for track, det in matched:
+            seen_before = self._last_seen.get(track.track_id) == self._frame_no - 1
+            self._last_seen[track.track_id] = self._frame_no
+            if not seen_before:
+                continue
+            x1, y1, x2, y2 = (max(0, int(v * self._shrink.scale)) for v in det.xyxy)
+            cur = self._cur[y1:y2, x1:x2]
+            if cur.size == 0:
+                continue
+            motion = cv2.absdiff(cur, self._prev[y1:y2, x1:x2]).mean()
+            acc = self._sums.setdefault(track.track_id, [0.0, 0, None])
+            acc[0] += motion
+            acc[1] += 1
+            acc[2] = track.animal_id
+
+    def totals(self, min_samples=None):
+        """
+        {animal_id: [motion sum, samples]} over tracks with enough samples —
+        plain numbers, so runs over parts of a video can be added up.
+        min_samples=0 keeps every track: raw sums for a checkpoint or a
+        segment, filtered once they are merged (merge_totals(min_samples=)).
+        """
+        min_samples = self.min_samples if min_samples is None else min_samples
+        per_animal = {}
+        for total, count, animal_id in self._sums.values():
+            if animal_id is None or count < min_samples:
+                continue
+            acc = per_animal.setdefault(animal_id, [0.0, 0])
+            acc[0] += float(total)
+            acc[1] += count
+        return per_animal
+
+    def behaviors(self):
+        """{animal_id: (label, mean motion)} for tracks with enough samples."""
+        return behaviors_from_totals(self.totals())
+
+
+def merge_totals(*parts, min_samples=0):
+    """Add up RoiMotion.totals() of several runs; drop animals with < min_samples samples."""
+    merged = {}
+    for part in parts:
+        for animal_id, (total, count) in part.items():
+            acc = merged.setdefault(animal_id, [0.0, 0])
+            acc[0] += total
+            acc[1] += count
+    return {a: acc for a, acc in merged.items() if acc[1] >= min_samples}
+
+
+def behaviors_from_totals(totals):
+    """{animal_id: (label, mean motion)} from {animal_id: [sum, samples]}."""
+    out = {}
+    for animal_id, (total, count) in totals.items():
+        if count:
+            stats = MotionStats(np.array([total / count]), np.zeros(1))
+            out[animal_id] = (classify_behavior(stats)[0], float(total / count))
+    return out
+
+
+class MotionGate:
+    """
+    Cheap "is it worth running YOLO?" check in front of the detector.
+
+    Each frame is shrunk to a `width`-pixel gray image and compared with
+    the last frame that was actually detected (not the previous frame, so
+    slow drift still adds up). Fewer than `min_changed` of the pixels
+    moving by more than `pixel_threshold` → the caller reuses the previous
+    detections. Every `max_skip` skipped frames the detector runs anyway.
+    """
+
+    def __init__(self, pixel_threshold=GATE_PIXEL_THRESHOLD, min_changed=GATE_MIN_CHANGED,
+                 max_skip=GATE_MAX_SKIP, width=64):
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.max_skip = max_skip
+        self._shrink = _GrayShrinker(width)
+        self._ref = None
+        self._cur = None
+        self._diff = None
+        self._run = 0
+        self.frames = 0
+        self.skipped = 0
+
+    def changed(self, frame):
+        """True → run the detector on this frame (it becomes the reference)."""
+        self.frames += 1
+        if self._ref is None:
+            sh, sw = self._shrink.allocate(frame)
+            self._ref = np.empty((sh, sw), dtype=np.uint8)
+            self._cur = np.empty_like(self._ref)
+            self._diff = np.empty_like(self._ref)
+            self._shrink(frame, self._ref)
+            return True
+
+        self._shrink(frame, self._cur)
+        cv2.absdiff(self._cur, self._ref, dst=self._diff)
+        moving = np.count_nonzero(self._diff > self.pixel_threshold) / self._diff.size
+        if moving < self.min_changed and self._run < self.max_skip:
+            self._run += 1
+            self.skipped += 1
+            return False
+
+        self._ref, self._cur = self._cur, self._ref
+        self._run = 0
+        return True
+
+    @property
+    def skip_fraction(self):
+        return self.skipped / self.frames if self.frames else 0.0
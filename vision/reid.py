@@ -0,0 +1,128 @@
+import threading
+
+import cv2
+import numpy as np
+
+from backend import metrics
+
+IDENTIFY_MS = metrics.histogram("farm_reid_identify_ms", "Hash + lookup time per crop")
+
+# Bits (out of 64) two crops may differ by and still be the same animal
+MATCH_THRESHOLD = 10
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(x):
+        return np.bitwise_count(x)
+else:
+    _BYTE_BITS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(x):
+        return _BYTE_BITS[x.view(np.uint8)].reshape(len(x), 8).sum(axis=1)
+
+
+def phash(crop):
+    """
+    64-bit difference hash of a BGR (or gray) crop: shrink to 9x8 gray and
+    record whether each pixel is brighter than its right neighbour. Robust
+    to small shifts, scale and lighting changes between frames, and needs
+    no JPEG encode.
+    """
+    small = cv2.resize(crop, (9, 8), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+class _TypeIndex:
+    """Packed uint64 hash matrix for one animal type, grown by doubling."""
+
+    def __init__(self):
+        self.hashes = np.zeros(64, dtype=np.uint64)
+        self.ids = []
+
+    def add(self, h, animal_id):
+        n = len(self.ids)
+        if n == len(self.hashes):
+            self.hashes = np.concatenate([self.hashes, np.zeros(n, dtype=np.uint64)])
+        self.hashes[n] = h
+        self.ids.append(animal_id)
+
+    def nearest(self, h):
+        n = len(self.ids)
+        if n == 0:
+            return None, 65
+        dist = _popcount(self.hashes[:n] ^ np.uint64(h))
+        i = int(np.argmin(dist))
+        return self.ids[i], int(dist[i])
+
+
+class ReIdIndex:
+    """
+    Re-identification by nearest perceptual hash among known animals of
+    the same type (vectorized Hamming distance). Unknown animals get a new
+    id derived from their hash and are added to the index.
+    """
+
+    def __init__(self, threshold=MATCH_THRESHOLD):
+        self.threshold = threshold
+        self._types = {}
+        self._ids = set()
+        self._herd_version = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_herd(cls, df, threshold=MATCH_THRESHOLD):
+        index = cls(threshold)
+        index.add_herd(df)
+        return index
+
+    def add_herd(self, df):
+        """Add the hashed herd rows whose animal is not in the index yet. Returns #added."""
+        if "phash" not in df.columns:
+            return 0
+        known = df.dropna(subset=["phash"])
+        with self._lock:
+            new = known[~known["animal_id"].isin(self._ids)]
+            for animal_id, animal_type, h in zip(new["animal_id"], new["animal_type"], new["phash"]):
+                self.add(int(str(h), 16), animal_type, animal_id)
+        return len(new)
+
+    def sync(self, version, herd):
+        """
+        add_herd(herd()) if the herd changed since the last sync — picks up
+        animals other processes (video jobs, other servers) registered.
+        `version`: e.g. database.herd_version(); `herd`: () → DataFrame.
+        """
+        with self._lock:
+            if version != self._herd_version:
+                self.add_herd(herd())
+                self._herd_version = version
+
+    def __len__(self):
+        return sum(len(t.ids) for t in self._types.values())
+
+    def add(self, h, animal_type, animal_id):
+        with self._lock:
+            self._types.setdefault(animal_type, _TypeIndex()).add(h, animal_id)
+            self._ids.add(animal_id)
+
+    def lookup(self, h, animal_type):
+        """(animal_id, distance) of the closest match within threshold, else (None, distance)."""
+        with self._lock:
+            index = self._types.get(animal_type)
+            if index is None:
+                return None, 65
+            animal_id, dist = index.nearest(h)
+        return (animal_id if dist <= self.threshold else None), dist
+
+    def identify(self, crop, animal_type):
+        """(animal_id, hex hash) for a crop, registering new animals."""
+        with IDENTIFY_MS.time():
+            h = phash(crop)
+            with self._lock:
+                animal_id, _ = self.lookup(h, animal_type)
+                if animal_id is None:
+                    animal_id = f"{animal_type.upper()}_{h:016x}"
+                    self.add(h, animal_type, animal_id)
+        return animal_id, f"{h:016x}"
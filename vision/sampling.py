@@ -0,0 +1,136 @@
+import cv2
+import numpy as np
+
+
+class StrideSampler:
+    """
+    Every `stride`-th frame. Skipped frames are only grab()bed — demuxed
+    and decoded but never converted to BGR or copied out of the decoder.
+    """
+
+    def __init__(self, stride=15):
+        self.stride = max(1, int(stride))
+
+    def frames(self, cap):
+        """Yield (frame_index, frame) — index is 0-based."""
+        index = 0
+        while True:
+            if (index + 1) % self.stride == 0:
+                ok, frame = cap.read()
+                if not ok:
+                    return
+                yield index, frame
+            elif not cap.grab():
+                return
+            index += 1
+
+
+class SeekSampler:
+    """
+    Jump straight to each wanted frame with CAP_PROP_POS_FRAMES. The
+    decoder restarts from the nearest keyframe, so this wins when the
+    stride is long compared with the keyframe interval.
+
+    Like the other samplers, indices count from where `cap` was when
+    frames() started (VideoEngine.run seeks there to resume or to start a
+    segment), so seeks are relative to that position.
+    """
+
+    def __init__(self, stride=15):
+        self.stride = max(1, int(stride))
+
+    def frames(self, cap):
+        base = int(cap.get(cv2.CAP_PROP_POS_FRAMES) or 0)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0) - base
+        index = self.stride - 1
+        while total <= 0 or index < total:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, base + index)
+            ok, frame = cap.read()
+            if not ok:
+                return
+            yield index, frame
+            index += self.stride
+
+
+class TimeSampler:
+    """`per_second` frames per second of video, whatever the source fps."""
+
+    def __init__(self, per_second=2.0):
+        self.per_second = per_second
+
+    def frames(self, cap):
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        step = fps / self.per_second
+        next_at = 0.0
+        index = 0
+        while True:
+            if index >= next_at:
+                ok, frame = cap.read()
+                if not ok:
+                    return
+                yield index, frame
+                next_at += step
+            elif not cap.grab():
+                return
+            index += 1
+
+
+class AdaptiveSampler:
+    """
+    Sparse sampling while the scene is still, dense while it moves: every
+    `slow_stride` frames a downscaled gray copy is compared with the last
+    sample; if the mean difference exceeds `threshold`, the next
+    `burst` samples are taken every `fast_stride` frames.
+    """
+
+    def __init__(self, slow_stride=30, fast_stride=5, threshold=4.0, burst=6, size=(64, 36)):
+        self.slow_stride = slow_stride
+        self.fast_stride = fast_stride
+        self.threshold = threshold
+        self.burst = burst
+        self.size = size
+        self.dense_samples = 0
+
+    def frames(self, cap):
+        small = np.empty(self.size[::-1], dtype=np.uint8)
+        prev = None
+        dense_left = 0
+        index = 0
+        next_at = self.slow_stride - 1
+        while True:
+            if index == next_at:
+                ok, frame = cap.read()
+                if not ok:
+                    return
+                yield index, frame
+
+                gray = cv2.cvtColor(
+                    cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA),
+                    cv2.COLOR_BGR2GRAY
+                )
+                if prev is not None:
+                    cv2.absdiff(gray, prev, dst=small)
+                    if small.mean() > self.threshold:
+                        dense_left = self.burst
+                prev = gray
+
+                if dense_left:
+                    dense_left -= 1
+                    self.dense_samples += 1
+                    next_at += self.fast_stride
+                else:
+                    next_at += self.slow_stride
+            elif not cap.grab():
+                return
+            index += 1
+
+
+def make_sampler(kind="stride", **options):
+    """Sampler by name: stride / seek / time / adaptive."""
+    kinds = {
+        "stride": StrideSampler,
+        "seek": SeekSampler,
+        "time": TimeSampler,
+        "adaptive": AdaptiveSampler
+    }
+    return kinds[kind](**options)
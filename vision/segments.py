@@ -0,0 +1,268 @@
+"""
+Overnight batch analysis of recorded footage on all cores.
+
+    python -m vision.segments barn_night.mp4 --workers 8
+
+Splits the video into frame ranges, processes each range in its own
+process (own model instance) and merges the results deterministically
+before writing them to the records store.
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from vision.motion import RoiMotion, SAMPLES_PER_SECOND, behaviors_from_totals, merge_totals
+from vision.reid import ReIdIndex
+from vision.tracker import TrackingStage, iou_matrix
+
+MIN_SEGMENT_SECONDS = 10
+STITCH_IOU = 0.3
+
+
+def split_ranges(total, parts, step=1):
+    """
+    `parts` contiguous [start, end) frame ranges covering 0..total. Starts
+    are multiples of the sampling step, so segments sample (nearly) the
+    frames a single pass would. An unknown length (total <= 0, e.g. a
+    container without a frame count) is one unbounded range, (0, None).
+    """
+    if total <= 0:
+        return [(0, None)]
+    step = max(1, int(step))
+    size = math.ceil(total / max(1, parts) / step) * step
+    return [(s, min(s + size, total)) for s in range(0, total, size)]
+
+
+# ---------- worker process ----------
+_model = None
+
+
+def _init_worker(model_factory):
+    global _model
+    _model = model_factory()
+
+
+def _seed_index(known):
+    index = ReIdIndex()
+    for h, animal_type, animal_id in known:
+        index.add(int(h, 16), animal_type, animal_id)
+    return index
+
+
+def run_segment(path, start, end, per_second, known):
+    """
+    Detect, track, identify and measure motion in frames [start, end).
+    Nothing is written to the records store here; the parent merges.
+    """
+    from vision.config import DetectionConfig
+    from vision.motion import MotionGate
+    from vision.sampling import TimeSampler
+    from vision.video import VideoEngine
+
+    stage = TrackingStage(_seed_index(known), "video")
+    roi_motion = RoiMotion()
+    tracks = {}
+    sightings = []    # (frame index, track id, sighting)
+    frames_seen = []
+
+    def on_batch(indices, frames, detections):
+        for index, frame, dets in zip(indices, frames, detections):
+            matched, new = stage.process(frame, dets)
+            roi_motion.update(frame, matched)
+            frames_seen.append(index)
+
+            identified = [t for t, _ in matched if t.identified_at == stage.frame_index]
+            for track, sighting in zip(identified, new):
+                sightings.append((index, track.track_id, sighting))
+
+            for track, det in matched:
+                t = tracks.setdefault(track.track_id, {
+                    "animal": det.animal, "first": index, "first_box": list(det.xyxy),
+                    "animal_id": None
+                })
+                t["last"] = index
+                t["last_box"] = list(det.xyxy)
+                t["animal_id"] = t["animal_id"] or track.animal_id
+
+    engine = VideoEngine(
+        DetectionConfig.load().bind(_model, "video"),
+        sampler=TimeSampler(per_second),
+        gate=MotionGate()
+    )
+    stats = engine.run(path, on_batch, start=start, end=end)
+    return {
+        "start": start,
+        "end": end,
+        "frames": [frames_seen[0], frames_seen[-1]] if frames_seen else None,
+        "tracks": tracks,
+        "sightings": sightings,
+        "motion": roi_motion.totals(),
+        "seconds": stats["seconds"]
+    }
+
+
+# ---------- merge ----------
+def _stitch(prev, seg):
+    """[(prev track id, track id)] for tracks running across the boundary."""
+    if not prev["frames"] or not seg["frames"]:
+        return []
+    ending = [tid for tid, t in prev["tracks"].items() if t["last"] == prev["frames"][1]]
+    starting = [tid for tid, t in seg["tracks"].items() if t["first"] == seg["frames"][0]]
+    if not ending or not starting:
+        return []
+
+    iou = iou_matrix(
+        np.array([prev["tracks"][t]["last_box"] for t in ending], dtype=float),
+        np.array([seg["tracks"][t]["first_box"] for t in starting], dtype=float)
+    )
+    for i, a in enumerate(ending):
+        for j, b in enumerate(starting):
+            if prev["tracks"][a]["animal"] != seg["tracks"][b]["animal"]:
+                iou[i, j] = 0
+
+    pairs, used_a, used_b = [], set(), set()
+    for flat in np.argsort(iou, axis=None, kind="stable")[::-1]:
+        i, j = divmod(int(flat), len(starting))
+        if iou[i, j] < STITCH_IOU:
+            break
+        if i in used_a or j in used_b:
+            continue
+        used_a.add(i)
+        used_b.add(j)
+        pairs.append((ending[i], starting[j]))
+    return pairs
+
+
+def merge_segments(segments, known):
+    """
+    One consistent result from per-segment results, in segment order:
+    tracks that continue across a boundary keep the earlier segment's
+    animal (their duplicate first sighting is dropped), other new animals
+    are de-duplicated by perceptual hash across segments, and motion
+    totals are added up under the final ids. Same input → same output.
+    """
+    index = _seed_index(known)
+    known_ids = {animal_id for _, _, animal_id in known}
+    sightings = []
+    motion = {}
+    stitched = 0
+    prev, prev_ids = None, {}
+
+    for seg in sorted(segments, key=lambda s: s["start"]):
+        id_map = {}
+        skip = set()
+        if prev is not None:
+            for a, b in _stitch(prev, seg):
+                own = seg["tracks"][b]["animal_id"]
+                if own is not None and a in prev_ids:
+                    id_map[own] = prev_ids[a]
+                    skip.add(b)
+                    stitched += 1
+
+        for frame, track_id, s in seg["sightings"]:
+            animal_id = s["animal_id"]
+            if animal_id not in id_map:
+                if animal_id in known_ids:
+                    id_map[animal_id] = animal_id
+                else:
+                    match, _ = index.lookup(int(s["phash"], 16), s["animal_type"])
+                    if match is None:
+                        index.add(int(s["phash"], 16), s["animal_type"], animal_id)
+                    id_map[animal_id] = match or animal_id
+            if track_id in skip:
+                skip.discard(track_id)   # only the track's first sighting is a duplicate
+                continue
+            sightings.append((frame, dict(s, animal_id=id_map[animal_id])))
+
+        prev_ids = {
+            tid: id_map.get(t["animal_id"], t["animal_id"])
+            for tid, t in seg["tracks"].items() if t["animal_id"] is not None
+        }
+        motion = merge_totals(motion, {
+            id_map.get(a, a): totals for a, totals in seg["motion"].items()
+        })
+        prev = seg
+
+    sightings.sort(key=lambda fs: fs[0])
+    return {
+        "sightings": [s for _, s in sightings],
+        "motion": motion,
+        "behaviors": behaviors_from_totals(motion),
+        "stitched": stitched,
+        "animals": len({s["animal_id"] for _, s in sightings})
+    }
+
+
+def process_video_parallel(path, workers=None, model_factory=None, known=(),
+                           per_second=SAMPLES_PER_SECOND):
+    """
+    Process a video split into `workers` frame ranges in parallel.
+    `known`: [(hex phash, animal type, animal id)] of the herd, so every
+    segment and the merge identify against the same snapshot.
+    """
+    if model_factory is None:
+        from vision.inference import load_detector
+        model_factory = load_detector
+    workers = workers or os.cpu_count() or 1
+
+    cap = cv2.VideoCapture(path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+
+    step = fps / per_second
+    parts = max(1, min(workers, int(total / (MIN_SEGMENT_SECONDS * fps)) or 1))
+    ranges = split_ranges(total, parts, step)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(ranges)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(model_factory,)
+    ) as pool:
+        segments = list(pool.map(
+            run_segment, *zip(*[(path, s, e, per_second, list(known)) for s, e in ranges])
+        ))
+
+    result = merge_segments(segments, list(known))
+    result["segments"] = len(ranges)
+    result["seconds"] = time.perf_counter() - start
+    # Without a frame count, the last frame reached stands in for the length
+    frames = total or max((seg["frames"][1] + 1 for seg in segments if seg["frames"]), default=0)
+    result["fps"] = frames / result["seconds"] if result["seconds"] else 0.0
+    return result
+
+
+def herd_hashes(df):
+    """[(hex phash, type, id)] for the herd rows that have a hash."""
+    known = df.dropna(subset=["phash"])
+    return list(zip(known["phash"].astype(str), known["animal_type"], known["animal_id"]))
+
+
+def main():
+    from backend.database import flush_sightings, get_all_animals, record_sightings, set_behaviors
+
+    parser = argparse.ArgumentParser(description="Process a recorded video on all cores")
+    parser.add_argument("video")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    result = process_video_parallel(args.video, args.workers, known=herd_hashes(get_all_animals()))
+    record_sightings(result["sightings"])
+    flush_sightings()
+    set_behaviors({a: label for a, (label, _) in result["behaviors"].items()})
+    print(
+        f"{result['segments']} segments, {result['animals']} animals "
+        f"({result['stitched']} tracks stitched), {result['fps']:.0f} frames/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
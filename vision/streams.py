@@ -0,0 +1,296 @@
+import logging
+import threading
+import time
+
+from backend import metrics
+from vision.detection import FRAMES, INFERENCE_MS, parse_results
+from vision.live import LatestFrame, PersistenceSink, annotate, open_camera, Rate
+from vision.motion import MIN_TRACK_SAMPLES, MotionGate, RoiMotion, behaviors_from_totals, merge_totals
+from vision.tracker import TrackingStage
+
+log = logging.getLogger(__name__)
+
+LATENCY_MS = metrics.histogram("farm_camera_latency_ms", "Capture → annotated frame, live cameras")
+ERRORS = metrics.counter("farm_camera_batch_errors_total", "Live camera batches that failed (model or tracking)")
+
+BEHAVIOR_INTERVAL = 60.0   # s of live motion behind each set of behavior labels
+
+
+class CameraStream:
+    """One registered camera: capture thread, own tracker, sampling rate."""
+
+    def __init__(self, camera_id, camera, reid, fps, gate=None, options=None, motion=None):
+        self.camera_id = camera_id
+        self.gate = gate
+        self.motion = motion           # RoiMotion of the current behavior window
+        self.options = options or {}   # model call options (DetectionConfig)
+        self.capture = LatestFrame(camera, name=f"capture-{camera_id}")
+        self.stage = TrackingStage(reid, "camera", camera_id=camera_id)
+        self.base_interval = 1.0 / fps
+        self.interval = self.base_interval
+        self.next_due = 0.0
+        self.seq = 0
+        self.inferred = 0
+        self.inference_fps = Rate()
+        self.latency_ms = 0.0
+        self.annotated = None
+
+    def stats(self):
+        return {
+            "capture_fps": self.capture.fps.value,
+            "inference_fps": self.inference_fps.value,
+            "target_fps": 1.0 / self.interval,
+            "latency_ms": self.latency_ms,
+            "captured": self.capture.captured,
+            "dropped": self.capture.dropped,
+            "inferred": self.inferred,
+            "skip_fraction": self.gate.skip_fraction if self.gate else 0.0,
+            "error": self.capture.error
+        }
+
+
+class StreamManager:
+    """
+    Several cameras sharing one loaded model.
+
+    Every camera has its own capture thread (latest frame only) and
+    tracker. A single scheduler thread walks the cameras round-robin,
+    taking at most one fresh frame from each camera that is due, and runs
+    the model once on the whole batch — so no camera can starve the others
+    and the model is never loaded twice.
+
+    Under CPU pressure the per-frame inference cost goes up; once the
+    cameras' combined sampling rate would need more than `utilization` of
+    the scheduler's time, every camera's interval is stretched by the same
+    factor (capped at max_interval). Cameras are sampled less often
+    instead of the whole barn falling further and further behind.
+
+    With gate_options (MotionGate keyword arguments, {} for the defaults)
+    each camera gets its own motion gate; frames of a still camera skip the
+    batch and reuse that camera's tracked boxes.
+
+    With a DetectionConfig, each camera is detected with its own options
+    (input size by camera id, else the "camera" size); a batch mixing
+    sizes is split into one model call per size.
+
+    A batch that fails (model error, bad frame) is counted, logged and
+    dropped; the scheduler carries on with the next frames. The last
+    error is in stats() for the UI.
+
+    With a behaviors_sink ({animal_id: label}, e.g. set_behaviors), every
+    camera measures per-animal motion inside the tracked boxes; each
+    behavior_interval the windows of all cameras are merged, labelled and
+    handed to the persist thread, and a new window starts.
+    """
+
+    def __init__(self, model, reid, sink, fps=5.0, batch_size=8,
+                 utilization=0.8, max_interval=5.0, gate_options=None, config=None,
+                 behaviors_sink=None, behavior_interval=BEHAVIOR_INTERVAL):
+        self.model = model
+        self.gate_options = gate_options
+        self.config = config
+        self.reid = reid
+        self.fps = fps
+        self.batch_size = batch_size
+        self.utilization = utilization
+        self.max_interval = max_interval
+        self.persist = PersistenceSink(sink, behaviors_sink=behaviors_sink)
+        self.behavior_interval = behavior_interval
+        self._behaviors_due = time.monotonic() + behavior_interval
+        self.streams = {}
+        self.load_factor = 1.0
+        self.batches = 0
+        self.frame_cost = None   # smoothed inference seconds per frame
+        self.errors = 0
+        self.last_error = None
+        self._cursor = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._worker = threading.Thread(target=self._schedule, name="scheduler", daemon=True)
+        metrics.gauge("farm_persist_queue_depth", "Sighting batches waiting to be stored",
+                      fn=self.persist.queue.qsize)
+
+    # ---------- cameras ----------
+    def add(self, camera_id, source, fps=None):
+        """Register a camera: device index / URL / video file, or a camera object."""
+        camera = open_camera(source) if isinstance(source, (str, int)) else source
+        gate = MotionGate(**self.gate_options) if self.gate_options is not None else None
+        options = self.config.options(self.model.names, camera_id, "camera") if self.config else None
+        motion = RoiMotion() if self.persist.behaviors_sink is not None else None
+        stream = CameraStream(camera_id, camera, self.reid, fps or self.fps, gate, options, motion)
+        with self._lock:
+            if camera_id in self.streams:
+                raise ValueError(f"Camera {camera_id!r} already registered")
+            self.streams[camera_id] = stream
+        if self._worker.is_alive():
+            stream.capture.start()
+        return stream
+
+    def remove(self, camera_id):
+        with self._lock:
+            stream = self.streams.pop(camera_id, None)
+        if stream is not None:
+            stream.capture.stop()
+
+    # ---------- lifecycle ----------
+    def start(self):
+        with self._lock:
+            streams = list(self.streams.values())
+        for stream in streams:
+            stream.capture.start()
+        self.persist.start()
+        self._worker.start()
+        return self
+
+    @property
+    def running(self):
+        return self._worker.is_alive()
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        with self._lock:
+            streams = list(self.streams.values())
+        for stream in streams:
+            stream.capture.stop()
+        self._worker.join(timeout)
+        for stream in streams:
+            if stream.capture.is_alive():
+                stream.capture.join(timeout)
+        self.persist.stop()
+        if self.persist.is_alive():
+            self.persist.join(timeout)
+
+    # ---------- scheduling ----------
+    def _pick(self, now):
+        """
+        Round-robin: ≤1 fresh frame per due camera, ≤batch_size in total.
+        Cameras due within half an interval ride along, so their schedules
+        line up and share model calls instead of drifting apart.
+        Frames the camera's motion gate rejects go to `still` instead.
+        → (batch, still)
+        """
+        with self._lock:
+            streams = list(self.streams.values())
+        if not streams:
+            return [], []
+        if not any(now >= s.next_due for s in streams):
+            return [], []
+        start = self._cursor % len(streams)
+        batch = []
+        still = []
+        for i in range(len(streams)):
+            stream = streams[(start + i) % len(streams)]
+            if now < stream.next_due - stream.interval / 2:
+                continue
+            item = stream.capture.take(after_seq=stream.seq, timeout=0)
+            if item is None:
+                continue
+            stream.seq = item[0]
+            stream.next_due = max(stream.next_due + stream.interval, now)
+            if stream.gate is not None and not stream.gate.changed(item[2]):
+                still.append((stream, item))
+                continue
+            batch.append((stream, item))
+            if len(batch) == self.batch_size:
+                # Next round starts with the first camera left out
+                self._cursor = start + i + 1
+                break
+        return batch, still
+
+    def _adapt(self, seconds, frames):
+        cost = seconds / frames
+        self.frame_cost = cost if self.frame_cost is None else 0.8 * self.frame_cost + 0.2 * cost
+        with self._lock:
+            streams = list(self.streams.values())
+        demand = sum(1.0 / s.base_interval for s in streams)   # frames/s wanted
+        self.load_factor = max(1.0, demand * self.frame_cost / self.utilization)
+        for stream in streams:
+            stream.interval = min(stream.base_interval * self.load_factor, self.max_interval)
+
+    def _finish(self, stream, item, detections):
+        _, captured_at, frame = item
+        matched, sightings = stream.stage.process(frame, detections)
+        self.persist.put(sightings)
+        if stream.motion is not None:
+            stream.motion.update(frame, matched)
+        stream.annotated = annotate(frame, matched)
+        stream.inferred += 1
+        stream.inference_fps.tick()
+        stream.latency_ms = (time.monotonic() - captured_at) * 1000
+        LATENCY_MS.observe(stream.latency_ms)
+        FRAMES.inc()
+
+    def _schedule(self):
+        while not self._stop_event.is_set():
+            batch, still = self._pick(time.monotonic())
+            try:
+                self._run_batch(batch, still)
+            except Exception as exc:
+                self.errors += 1
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                ERRORS.inc()
+                log.exception("Live camera batch failed")
+                self._stop_event.wait(0.1)   # don't spin on a persistent failure
+                continue
+            if not batch and not still:
+                self._stop_event.wait(0.01)
+            if self.persist.behaviors_sink is not None and time.monotonic() >= self._behaviors_due:
+                self._publish_behaviors()
+
+    def _publish_behaviors(self):
+        """Label the closed motion window of all cameras; start a new one."""
+        self._behaviors_due = time.monotonic() + self.behavior_interval
+        with self._lock:
+            streams = list(self.streams.values())
+        parts = []
+        for stream in streams:
+            if stream.motion is not None:
+                parts.append(stream.motion.totals(min_samples=0))
+                stream.motion = RoiMotion()
+        behaviors = behaviors_from_totals(merge_totals(*parts, min_samples=MIN_TRACK_SAMPLES))
+        self.persist.put_behaviors({a: label for a, (label, _) in behaviors.items()})
+
+    def _run_batch(self, batch, still):
+        """Finish the still frames, run the model once per input size on the rest."""
+        for stream, item in still:
+            self._finish(stream, item, stream.stage.tracker.carried())
+        if not batch:
+            return
+
+        groups = {}
+        for stream, item in batch:
+            groups.setdefault(stream.options.get("imgsz"), []).append((stream, item))
+
+        t0 = time.perf_counter()
+        done = []
+        for group in groups.values():
+            options = group[0][0].options
+            results = self.model([frame for _, (_, _, frame) in group], **options)
+            done.extend(zip(group, results))
+        seconds = time.perf_counter() - t0
+        INFERENCE_MS.observe(seconds * 1000 / len(batch), len(batch))
+        self._adapt(seconds, len(batch))
+        self.batches += 1
+
+        for (stream, item), result in done:
+            self._finish(stream, item, parse_results(result))
+
+    # ---------- readouts ----------
+    def latest(self, camera_id):
+        """Most recent annotated frame (BGR) of one camera, or None."""
+        stream = self.streams.get(camera_id)
+        return stream.annotated if stream is not None else None
+
+    def stats(self):
+        with self._lock:
+            streams = dict(self.streams)
+        return {
+            "cameras": {cid: s.stats() for cid, s in streams.items()},
+            "load_factor": self.load_factor,
+            "batches": self.batches,
+            "frame_cost_ms": (self.frame_cost or 0.0) * 1000,
+            "persisted": self.persist.written,
+            "persist_queue": self.persist.queue.qsize(),
+            "errors": self.errors,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,152 @@
+import numpy as np
+
+from vision.detection import Detection, crop_of, make_sighting
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU of boxes a (N,4) and b (M,4), xyxy."""
+    a = a[:, None, :]
+    b = b[None, :, :]
+    ix1 = np.maximum(a[..., 0], b[..., 0])
+    iy1 = np.maximum(a[..., 1], b[..., 1])
+    ix2 = np.minimum(a[..., 2], b[..., 2])
+    iy2 = np.minimum(a[..., 3], b[..., 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+class Track:
+    __slots__ = (
+        "track_id", "animal", "box", "velocity", "conf",
+        "hits", "missed", "animal_id", "phash", "identified_at"
+    )
+
+    def __init__(self, track_id, det):
+        self.track_id = track_id
+        self.animal = det.animal
+        self.box = np.array(det.xyxy, dtype=float)
+        self.velocity = np.zeros(4)
+        self.conf = det.conf
+        self.hits = 1
+        self.missed = 0
+        self.animal_id = None
+        self.phash = None
+        self.identified_at = None
+
+    def predict(self):
+        return self.box + self.velocity
+
+    def update(self, det):
+        box = np.array(det.xyxy, dtype=float)
+        # Smoothed constant-velocity model (alpha-beta filter)
+        self.velocity = 0.5 * self.velocity + 0.5 * (box - self.box)
+        self.box = box
+        self.conf = det.conf
+        self.hits += 1
+        self.missed = 0
+
+
+class IoUTracker:
+    """
+    SORT-style tracker in pure NumPy: predict each track forward with its
+    velocity, match to detections of the same class by greedy highest-IoU
+    assignment, start tracks for unmatched boxes and drop tracks that have
+    been missing for more than max_missed updates.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=5):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = []
+        self._next_id = 1
+
+    def update(self, detections):
+        """Returns [(track, detection)] for every detection of this frame."""
+        matched = []
+        unmatched = list(range(len(detections)))
+        used = set()
+
+        if self.tracks and detections:
+            predicted = np.array([t.predict() for t in self.tracks])
+            boxes = np.array([d.xyxy for d in detections], dtype=float)
+            iou = iou_matrix(predicted, boxes)
+
+            # Only same-class pairs may match
+            same = np.array([[t.animal == d.animal for d in detections] for t in self.tracks])
+            iou[~same] = 0
+
+            for flat in np.argsort(iou, axis=None)[::-1]:
+                ti, di = divmod(int(flat), len(detections))
+                if iou[ti, di] < self.iou_threshold:
+                    break
+                if ti in used or di not in unmatched:
+                    continue
+                used.add(ti)
+                unmatched.remove(di)
+                self.tracks[ti].update(detections[di])
+                matched.append((self.tracks[ti], detections[di]))
+
+        for ti, track in enumerate(self.tracks):
+            if ti not in used:
+                track.missed += 1
+                track.box = track.predict()
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+
+        for di in unmatched:
+            track = Track(self._next_id, detections[di])
+            self._next_id += 1
+            self.tracks.append(track)
+            matched.append((track, detections[di]))
+
+        return matched
+
+    def carried(self):
+        """Detections for a frame the detector skipped: every live track's box."""
+        return [
+            Detection(t.animal, t.conf, tuple(int(v) for v in t.box))
+            for t in self.tracks if t.missed == 0
+        ]
+
+
+class TrackingStage:
+    """
+    Detection → identity pipeline stage shared by the Video and Live Camera
+    pages. Re-ID and persistence run once when a track starts and then only
+    every refresh_every frames, instead of once per box per frame.
+    """
+
+    def __init__(self, reid, source, refresh_every=150, tracker=None, camera_id=None):
+        self.reid = reid
+        self.source = source
+        self.camera_id = camera_id
+        self.refresh_every = refresh_every
+        self.tracker = tracker or IoUTracker()
+        self.frame_index = 0
+        self.identified = 0
+
+    def process(self, frame, detections):
+        """Returns (matched [(track, detection)], new sightings to record)."""
+        self.frame_index += 1
+        matched = self.tracker.update(detections)
+        sightings = []
+
+        for track, det in matched:
+            due = (
+                track.animal_id is None
+                or self.frame_index - track.identified_at >= self.refresh_every
+            )
+            if not due:
+                continue
+            crop = crop_of(frame, det.xyxy)
+            if crop.size == 0:
+                continue
+            track.animal_id, track.phash = self.reid.identify(crop, det.animal.capitalize())
+            track.identified_at = self.frame_index
+            self.identified += 1
+            sightings.append(make_sighting(
+                track.animal_id, track.phash, det, self.source, self.camera_id
+            ))
+
+        return matched, sightings
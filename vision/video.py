@@ -0,0 +1,156 @@
+import queue
+import threading
+import time
+
+import cv2
+
+from backend import metrics
+from vision.detection import FRAMES, INFERENCE_MS, parse_results
+from vision.sampling import StrideSampler
+
+_END = object()
+
+DECODE_MS = metrics.histogram("farm_video_decode_ms", "Decode time per sampled video frame")
+QUEUE_DEPTH = metrics.gauge("farm_video_queue_depth", "Decoded frames waiting for the model")
+
+
+class VideoEngine:
+    """
+    Decode → batched inference → consumer, for recorded videos.
+
+    A producer thread decodes the frames chosen by the sampler (default:
+    every 15th, see vision.sampling) into a bounded queue
+    (a full queue blocks the decoder, so memory stays flat however fast it
+    decodes). The calling thread takes up to batch_size frames at a time,
+    runs the YOLO model once on the whole batch and hands the frames and
+    their detections to on_batch for cropping / ID / persistence.
+
+    With a MotionGate, only frames that changed since the last detected one
+    go into the batch; the others get that frame's detections again.
+    """
+
+    def __init__(self, model, batch_size=8, queue_size=32, sampler=None, gate=None):
+        self.model = model
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.sampler = sampler or StrideSampler(15)
+        self.gate = gate
+
+    def _put(self, frames, item, stop):
+        # Blocks while the queue is full (backpressure) unless we are stopping
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _produce(self, cap, frames, state, stop, start, end):
+        try:
+            t0 = time.perf_counter()
+            for index, frame in self.sampler.frames(cap):
+                DECODE_MS.observe((time.perf_counter() - t0) * 1000)
+                if stop.is_set() or (end is not None and start + index >= end):
+                    break
+                state["decoded"] = start + index + 1
+                self._put(frames, (start + index, frame), stop)
+                t0 = time.perf_counter()
+        except BaseException as exc:
+            state["error"] = exc
+        finally:
+            self._put(frames, _END, stop)
+
+    def _next_batch(self, frames):
+        """Up to batch_size queued frames (waits for the first). → (batch, ended)"""
+        batch = []
+        item = frames.get()
+        while item is not _END:
+            batch.append(item)
+            if len(batch) == self.batch_size:
+                return batch, False
+            try:
+                # Don't hold a partial batch back waiting for the decoder
+                item = frames.get(timeout=0.05)
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def run(self, path, on_batch, on_progress=None, start=0, end=None):
+        """
+        Process frames [start, end) of a video file (from `start` to resume
+        a checkpoint; both to process one segment).
+        on_batch(indices, frames, detections) is called per batch;
+        on_progress(decoded, total) after each batch. Returns timing stats.
+        """
+        cap = cv2.VideoCapture(path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        frames = queue.Queue(maxsize=self.queue_size)
+        state = {"decoded": start, "error": None}
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._produce, args=(cap, frames, state, stop, start, end), daemon=True
+        )
+
+        began = time.perf_counter()
+        infer_s = 0.0
+        processed = batches = skipped = 0
+        previous = []   # detections of the last frame the model saw
+        producer.start()
+        try:
+            done = False
+            while not done:
+                batch, done = self._next_batch(frames)
+                if not batch:
+                    continue
+                QUEUE_DEPTH.set(frames.qsize())
+                indices = [i for i, _ in batch]
+                images = [f for _, f in batch]
+
+                run = [self.gate is None or self.gate.changed(f) for f in images]
+                wanted = [f for f, r in zip(images, run) if r]
+                if wanted:
+                    t0 = time.perf_counter()
+                    results = iter(self.model(wanted))
+                    seconds = time.perf_counter() - t0
+                    infer_s += seconds
+                    INFERENCE_MS.observe(seconds * 1000 / len(wanted), len(wanted))
+
+                detections = []
+                for r in run:
+                    if r:
+                        previous = parse_results(next(results))
+                    else:
+                        skipped += 1
+                    detections.append(previous)
+
+                on_batch(indices, images, detections)
+                processed += len(batch)
+                batches += 1
+                FRAMES.inc(len(batch))
+                if on_progress:
+                    on_progress(state["decoded"], total)
+        finally:
+            stop.set()
+            producer.join()
+            cap.release()
+
+        if state["error"] is not None:
+            raise state["error"]
+        if total:
+            state["decoded"] = min(total, end) if end is not None else total
+
+        elapsed = time.perf_counter() - began
+        decoded = state["decoded"] - start
+        return {
+            "decoded_frames": decoded,
+            "processed_frames": processed,
+            "skipped_frames": skipped,
+            "skip_fraction": skipped / processed if processed else 0.0,
+            "batches": batches,
+            "seconds": elapsed,
+            "inference_seconds": infer_s,
+            "fps": decoded / elapsed if elapsed else 0.0,
+            "processed_fps": processed / elapsed if elapsed else 0.0
+        }